@@ -2,12 +2,27 @@
 """Embedding generation utilities."""
 
 from .base_embeddings import BaseEmbeddings
-from .openai_embeddings import OpenAIEmbeddings
-from .sentence_transformer_embeddings import SentenceTransformerEmbeddings
-from .voyage_embeddings import VoyageEmbeddings
+from .embedding_cache import EmbeddingCache
+from .near_duplicates import NearDuplicateFilter
+
+# Providers are imported lazily so that importing the package does not pull in
+# openai, voyageai or sentence_transformers (torch) until one is used.
+def __getattr__(name):
+    if name == "OpenAIEmbeddings":
+        from .openai_embeddings import OpenAIEmbeddings
+        return OpenAIEmbeddings
+    elif name == "SentenceTransformerEmbeddings":
+        from .sentence_transformer_embeddings import SentenceTransformerEmbeddings
+        return SentenceTransformerEmbeddings
+    elif name == "VoyageEmbeddings":
+        from .voyage_embeddings import VoyageEmbeddings
+        return VoyageEmbeddings
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 __all__ = [
     "BaseEmbeddings",
+    "EmbeddingCache",
+    "NearDuplicateFilter",
     "OpenAIEmbeddings",
     "SentenceTransformerEmbeddings",
     "VoyageEmbeddings",
@@ -1,12 +1,82 @@
 """Base embedding interface."""
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Sequence
+
+import numpy as np
+
+
+# Number of single-text embeddings kept in each provider's in-memory LRU cache.
+EMBED_CACHE_SIZE = 4096
+
+
+def quantize_int8(embeddings: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize rows and quantize them to int8.
+
+    Every row is scaled by the same constant (127), so cosine similarity
+    between quantized vectors (or against a float query) is preserved up to
+    rounding error and no per-row scale needs to be stored.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    normalized = embeddings / np.maximum(norms, np.finfo(np.float32).tiny)
+    return np.clip(np.round(normalized * 127), -127, 127).astype(np.int8)
+
+
+def fit_batch_size(texts: Sequence[str], batch_size: int, token_limit: int) -> int:
+    """
+    Shrink ``batch_size`` so a batch of ``texts`` stays under a per-request token limit.
+
+    Tokens are estimated as characters / 4, averaged over the first 32 texts.
+    """
+    sample = texts[:32]
+    if not sample:
+        return batch_size
+    avg_tokens = max(sum(map(len, sample)) / len(sample) / 4, 1)
+    return max(1, min(batch_size, int(token_limit // avg_tokens)))
+
+
+def embed_unique(
+    texts: Sequence[str],
+    embed_fn: Callable[[List[str]], Sequence[Sequence[float]]],
+    dimension: int,
+) -> np.ndarray:
+    """
+    Embed each distinct text once and scatter results back to ``texts``.
+
+    Blank texts raise ValueError: providers reject them, and there is no
+    meaningful vector to store in their place (a zero vector has no cosine
+    similarity). Callers drop empty chunks before embedding.
+
+    Returns:
+        float32 array of shape (len(texts), dimension)
+    """
+    index = {}
+    inverse = np.empty(len(texts), dtype=np.intp)
+    for i, text in enumerate(texts):
+        if not text.strip():
+            raise ValueError(f"Cannot embed blank text (at index {i}); drop empty chunks before embedding")
+        inverse[i] = index.setdefault(text, len(index))
+
+    unique = list(index)
+    if not unique:
+        return np.zeros((0, dimension), dtype=np.float32)
+
+    embeddings = np.asarray(embed_fn(unique), dtype=np.float32)
+    if len(unique) == len(texts):
+        return embeddings
+    return embeddings[inverse]
 
 
 class BaseEmbeddings(ABC):
     """Abstract base class for embedding providers."""
 
+    # When True, `embed_batch_np` returns int8-quantized vectors for storage.
+    quantize: bool = False
+
     @abstractmethod
     def embed(self, text: str) -> List[float]:
         """
@@ -34,6 +104,23 @@ class BaseEmbeddings(ABC):
         """
         pass
 
+    def embed_batch_np(self, texts: List[str], batch_size: int = 100) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts as a float32 array.
+
+        Providers override this to fill the array directly from API responses;
+        the default converts the result of `embed_batch`.
+
+        Returns:
+            Array of shape (len(texts), dimension); int8 if `quantize` is set
+        """
+        embeddings = np.asarray(self.embed_batch(texts, batch_size), dtype=np.float32)
+        embeddings = embeddings.reshape(len(texts), -1) if len(texts) else embeddings.reshape(0, self.dimension)
+        return self._maybe_quantize(embeddings)
+
+    def _maybe_quantize(self, embeddings: np.ndarray) -> np.ndarray:
+        return quantize_int8(embeddings) if self.quantize else embeddings
+
     @property
     @abstractmethod
     def dimension(self) -> int:
@@ -45,3 +132,44 @@ class BaseEmbeddings(ABC):
     def model_name(self) -> str:
         """Return the name of the embedding model."""
         pass
+
+
+def run_coroutine(coro):
+    """Run ``coro`` to completion from synchronous code.
+
+    ``asyncio.run`` cannot be called while an event loop is already running
+    in this thread (e.g. inside Gradio or Jupyter), so in that case the
+    coroutine is run on a fresh loop in a worker thread.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+class EmbeddingBuffer:
+    """Preallocated float32 matrix that embedding batches are written into.
+
+    The width is taken from the first batch written rather than trusted from
+    a provider's nominal `dimension`, which may not match what the API returns.
+    """
+
+    def __init__(self, rows: int, dimension: int):
+        self.rows = rows
+        self.dimension = dimension
+        self.array = None
+
+    def write(self, offset: int, vectors: Sequence[Sequence[float]]):
+        """Copy ``vectors`` into rows ``offset`` onwards."""
+        if self.array is None:
+            width = len(vectors[0]) if len(vectors) else self.dimension
+            self.array = np.empty((self.rows, width), dtype=np.float32)
+        self.array[offset : offset + len(vectors)] = vectors
+
+    def result(self) -> np.ndarray:
+        """Return the filled array."""
+        if self.array is None:
+            return np.empty((self.rows, self.dimension), dtype=np.float32)
+        return self.array
@@ -0,0 +1,120 @@
+"""Content-addressed on-disk cache for embedding vectors."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "ragsystem", "embeddings.db")
+
+# SQLite limits the number of bound parameters per statement.
+_SQLITE_MAX_PARAMS = 500
+
+
+class EmbeddingCache:
+    """Persist embeddings keyed by a hash of (model name, text).
+
+    Vectors are stored as float32 bytes in a single SQLite file, so identical
+    chunks are only sent to an embedding API once, across runs and across
+    collections. Pass an instance to ``OpenAIEmbeddings``,
+    ``VoyageEmbeddings`` or ``SentenceTransformerEmbeddings`` via their
+    ``cache`` argument.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file to use (defaults to ~/.cache/ragsystem/embeddings.db)
+        """
+        self.path = path or DEFAULT_CACHE_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+
+    @staticmethod
+    def key(model: str, text: str) -> str:
+        """Return the cache key for ``text`` embedded with ``model``."""
+        return hashlib.blake2b(f"{model}\x00{text}".encode("utf-8"), digest_size=32).hexdigest()
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Look up embeddings for ``texts``; misses are returned as ``None``."""
+        keys = [self.key(model, text) for text in texts]
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), _SQLITE_MAX_PARAMS):
+                batch = keys[i : i + _SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                )
+                found.update(rows)
+
+        return [np.frombuffer(found[k], dtype=np.float32) if k in found else None for k in keys]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence[Sequence[float]]):
+        """Store embeddings for ``texts``."""
+        rows = [
+            (self.key(model, text), np.asarray(vector, dtype=np.float32).tobytes())
+            for text, vector in zip(texts, vectors)
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+
+    def embed_through(
+        self,
+        model: str,
+        texts: Sequence[str],
+        embed_fn: Callable[[List[str]], Sequence[Sequence[float]]],
+    ) -> np.ndarray:
+        """
+        Return embeddings for ``texts``, calling ``embed_fn`` only on cache misses.
+
+        Args:
+            model: Model name the vectors belong to (part of the cache key)
+            texts: Texts to embed
+            embed_fn: Function embedding a list of texts, used for misses
+
+        Returns:
+            float32 array of embeddings in the same order as ``texts``
+        """
+        vectors = self.get_many(model, texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+
+        if missing:
+            missing_texts = [texts[i] for i in missing]
+            fresh = np.asarray(embed_fn(missing_texts), dtype=np.float32)
+            self.put_many(model, missing_texts, fresh)
+            for i, vector in zip(missing, fresh):
+                vectors[i] = vector
+
+        if not vectors:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.stack(vectors)
+
+    def clear(self):
+        """Remove all cached embeddings."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM embeddings")
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        """Return the number of cached embeddings."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
@@ -0,0 +1,120 @@
+"""Reuse embeddings across near-duplicate texts using 64-bit SimHash."""
+
+import hashlib
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+def simhash(text: str, ngram: int = 3) -> int:
+    """
+    Return the 64-bit SimHash of ``text`` over word ``ngram`` shingles.
+
+    Texts that share most of their shingles get hashes a small Hamming
+    distance apart.
+    """
+    words = text.lower().split()
+    if len(words) > ngram:
+        shingles = [" ".join(words[i : i + ngram]) for i in range(len(words) - ngram + 1)]
+    else:
+        shingles = words or [text]
+
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(shingles), 8), axis=1)
+    # Bit i of the result is set when most shingle hashes have it set
+    majority = bits.sum(axis=0) * 2 > len(shingles)
+    return int.from_bytes(np.packbits(majority).tobytes(), "big")
+
+
+class NearDuplicateFilter:
+    """Embed near-duplicate texts once.
+
+    Boilerplate such as navigation and footers repeats on every page of a
+    crawl. Texts whose SimHash is within ``max_distance`` bits of an already
+    embedded text reuse that text's vector instead of being sent to the
+    embedding provider. The filter keeps its hashes and vectors for its whole
+    lifetime, so one instance deduplicates across many loads.
+    """
+
+    # 64-bit hashes are split into this many bands; two hashes within
+    # max_distance < _BANDS bits must agree exactly on at least one band
+    _BANDS = 4
+
+    def __init__(self, max_distance: int = 3):
+        """
+        Args:
+            max_distance: Largest Hamming distance between SimHashes treated as
+                a near duplicate (at most 3)
+        """
+        if not 0 <= max_distance < self._BANDS:
+            raise ValueError(f"max_distance must be between 0 and {self._BANDS - 1}")
+        self.max_distance = max_distance
+        self._vectors: Dict[int, np.ndarray] = {}
+        self._bands: List[Dict[int, List[int]]] = [{} for _ in range(self._BANDS)]
+
+    def _band_keys(self, h: int):
+        width = 64 // self._BANDS
+        mask = (1 << width) - 1
+        return [(h >> (band * width)) & mask for band in range(self._BANDS)]
+
+    def _find(self, h: int) -> Optional[int]:
+        for band, key in zip(self._bands, self._band_keys(h)):
+            for candidate in band.get(key, ()):
+                if (candidate ^ h).bit_count() <= self.max_distance:
+                    return candidate
+        return None
+
+    def _insert(self, h: int):
+        for band, key in zip(self._bands, self._band_keys(h)):
+            band.setdefault(key, []).append(h)
+
+    def _remove(self, h: int):
+        for band, key in zip(self._bands, self._band_keys(h)):
+            band[key].remove(h)
+
+    def embed_through(self, texts: Sequence[str], embed_fn: Callable[[List[str]], np.ndarray]) -> np.ndarray:
+        """
+        Embed ``texts``, calling ``embed_fn`` only for texts with no near duplicate.
+
+        Returns:
+            Array of shape (len(texts), dimension) in the order of ``texts``
+        """
+        texts = list(texts)
+        if not texts:
+            return np.asarray(embed_fn([]))
+
+        misses: List[str] = []
+        pending: Dict[int, int] = {}  # hash -> row in embed_fn's result
+        sources = []  # per text: hash of the text whose vector it uses
+
+        for text in texts:
+            h = simhash(text)
+            match = self._find(h)
+            if match is None:
+                pending[h] = len(misses)
+                misses.append(text)
+                self._insert(h)
+                match = h
+            sources.append(match)
+
+        if misses:
+            try:
+                vectors = np.asarray(embed_fn(misses))
+            except BaseException:
+                # Hashes of this batch are in the index without vectors
+                for h in pending:
+                    self._remove(h)
+                raise
+            for h, row in pending.items():
+                self._vectors[h] = vectors[row]
+
+        return np.stack([self._vectors[h] for h in sources])
+
+    def clear(self):
+        """Forget all hashes and vectors."""
+        self._vectors.clear()
+        for band in self._bands:
+            band.clear()
+
+    def __len__(self):
+        return len(self._vectors)
@@ -1,10 +1,61 @@
 
 """OpenAI embedding generation."""
 
+import asyncio
+import json
 import os
-from typing import List, Optional
+import time
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
 import openai
-from .base_embeddings import BaseEmbeddings
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from .base_embeddings import (
+    EMBED_CACHE_SIZE,
+    BaseEmbeddings,
+    EmbeddingBuffer,
+    embed_unique,
+    fit_batch_size,
+    run_coroutine,
+)
+from .embedding_cache import EmbeddingCache
+
+
+# Transient API failures worth retrying; anything else (bad request, auth)
+# is raised immediately.
+_RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+# Per-request token limit of the embeddings endpoint.
+_TOKEN_LIMIT = 300_000
+
+# The Batch API accepts at most this many requests per input file.
+_BATCH_API_MAX_REQUESTS = 50_000
+
+_retry_transient = retry(
+    wait=wait_random_exponential(min=1, max=20),
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+    reraise=True,
+)
+
+
+def _batch_error_message(result: dict) -> str:
+    """Describe why a single Batch API request failed."""
+    response = result.get("response") or {}
+    error = result.get("error") or (response.get("body") or {}).get("error") or response
+    if isinstance(error, dict) and error.get("message"):
+        error = error["message"]
+    return f"request {result.get('custom_id')}: {error}"
 
 
 class OpenAIEmbeddings(BaseEmbeddings):
@@ -15,16 +66,25 @@ class OpenAIEmbeddings(BaseEmbeddings):
     `embed_batch` without an API key will raise a descriptive error.
     """
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "text-embedding-3-small"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "text-embedding-3-small",
+                 max_concurrency: int = 16, cache: Optional[EmbeddingCache] = None,
+                 quantize: bool = False):
         """Store configuration; client will be created on demand.
 
         Args:
             api_key: OpenAI API key (falls back to OPENAI_API_KEY env var)
             model: Embedding model to use
+            max_concurrency: Maximum number of batch requests in flight at once
+            cache: Optional on-disk cache; only texts missing from it hit the API
+            quantize: Return int8-quantized vectors from `embed_batch_np`
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         self.model = model
+        self.max_concurrency = max_concurrency
+        self.cache = cache
+        self.quantize = quantize
         self.client = None
+        self._embed_cached = lru_cache(maxsize=EMBED_CACHE_SIZE)(self._embed_uncached)
 
     def _ensure_client(self):
         if self.client is not None:
@@ -36,28 +96,159 @@ class OpenAIEmbeddings(BaseEmbeddings):
     def embed(self, text: str) -> List[float]:
         """Generate embedding for a single text.
 
-        Raises a ValueError if no API key is configured.
+        Repeated texts are served from an in-memory LRU cache. Raises a
+        ValueError if no API key is configured.
         """
+        return list(self._embed_cached(self.model, text))
+
+    def _embed_uncached(self, model: str, text: str) -> Tuple[float, ...]:
+        if self.cache is not None:
+            return tuple(self._embed_batch_float([text])[0].tolist())
         self._ensure_client()
-        response = self.client.embeddings.create(
-            input=text,
-            model=self.model,
-        )
-        return response.data[0].embedding
+        response = self._create_with_retry(input=text, model=model)
+        return tuple(response.data[0].embedding)
+
+    def clear_cache(self):
+        """Drop the in-memory cache of single-text embeddings."""
+        self._embed_cached.cache_clear()
 
     def embed_batch(self, texts: List[str], batch_size: int = 100) -> List[List[float]]:
-        """Generate embeddings for multiple texts in batches."""
+        """Generate embeddings for multiple texts in batches.
+
+        See `embed_batch_np` for the array form.
+        """
+        return self._embed_batch_float(texts, batch_size).tolist()
+
+    def embed_batch_np(self, texts: List[str], batch_size: int = 100) -> np.ndarray:
+        """Generate embeddings for multiple texts as a float32 array.
+
+        When the input spans more than one batch, the requests are sent
+        concurrently (bounded by ``max_concurrency``). Each response is copied
+        into a preallocated array at its input offset, so no per-float Python
+        objects are kept. With a cache configured only uncached texts are sent.
+        Returns int8 vectors when ``quantize`` is set.
+        """
+        return self._maybe_quantize(self._embed_batch_float(texts, batch_size))
+
+    def _embed_batch_float(self, texts: List[str], batch_size: int = 100) -> np.ndarray:
+        """Float32 embeddings for ``texts``, going through the cache if configured.
+
+        Duplicate texts are sent once; blank texts raise ValueError.
+        """
+        def embed_fn(unique: List[str]) -> np.ndarray:
+            if self.cache is not None:
+                return self.cache.embed_through(
+                    self.model, unique, lambda missing: self._embed_batch_uncached(missing, batch_size)
+                )
+            return self._embed_batch_uncached(unique, batch_size)
+
+        return embed_unique(texts, embed_fn, self.dimension)
+
+    def _embed_batch_uncached(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Embed ``texts`` via the API, bypassing the cache."""
+        batch_size = fit_batch_size(texts, batch_size, _TOKEN_LIMIT)
         self._ensure_client()
-        embeddings: List[List[float]] = []
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            response = self.client.embeddings.create(
-                input=batch,
-                model=self.model,
+        buffer = EmbeddingBuffer(len(texts), self.dimension)
+        offsets = range(0, len(texts), batch_size)
+        if len(offsets) <= 1:
+            for offset in offsets:
+                response = self._create_with_retry(input=texts[offset : offset + batch_size], model=self.model)
+                buffer.write(offset, [item.embedding for item in response.data])
+        else:
+            run_coroutine(self._embed_batches_async(texts, batch_size, buffer))
+        return buffer.result()
+
+    def embed_batch_async_job(self, texts: List[str], poll_interval: float = 30) -> np.ndarray:
+        """Embed texts through the OpenAI Batch API (about half the price of the
+        regular endpoint, results within 24h).
+
+        Intended for large, non-latency-critical ingestion. Blocks, polling every
+        ``poll_interval`` seconds, until all jobs finish. Returns the same array
+        as `embed_batch_np`; with a cache configured only uncached texts are sent.
+        Duplicate texts are sent once; blank texts raise ValueError.
+        """
+        def embed_fn(unique: List[str]) -> np.ndarray:
+            if self.cache is not None:
+                return self.cache.embed_through(
+                    self.model, unique, lambda missing: self._embed_batch_job_uncached(missing, poll_interval)
+                )
+            return self._embed_batch_job_uncached(unique, poll_interval)
+
+        return self._maybe_quantize(embed_unique(texts, embed_fn, self.dimension))
+
+    def _embed_batch_job_uncached(self, texts: List[str], poll_interval: float) -> np.ndarray:
+        """Submit Batch API jobs for ``texts`` and assemble the results by custom_id."""
+        self._ensure_client()
+        buffer = EmbeddingBuffer(len(texts), self.dimension)
+
+        jobs = []
+        for offset in range(0, len(texts), _BATCH_API_MAX_REQUESTS):
+            lines = [
+                json.dumps({
+                    "custom_id": str(i),
+                    "method": "POST",
+                    "url": "/v1/embeddings",
+                    "body": {"model": self.model, "input": text},
+                })
+                for i, text in enumerate(texts[offset : offset + _BATCH_API_MAX_REQUESTS], start=offset)
+            ]
+            input_file = self.client.files.create(
+                file=("embeddings.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
             )
-            batch_embeddings = [item.embedding for item in response.data]
-            embeddings.extend(batch_embeddings)
-        return embeddings
+            jobs.append(self.client.batches.create(
+                input_file_id=input_file.id, endpoint="/v1/embeddings", completion_window="24h"
+            ))
+
+        received = 0
+        errors = []
+        for job in jobs:
+            while job.status not in ("completed", "failed", "expired", "cancelled"):
+                time.sleep(poll_interval)
+                job = self.client.batches.retrieve(job.id)
+            if job.status != "completed":
+                raise RuntimeError(f"OpenAI batch job {job.id} ended with status '{job.status}'")
+
+            # Successful requests land in the output file, failed ones in the error file
+            if job.output_file_id:
+                for result in self._read_batch_file(job.output_file_id):
+                    response = result.get("response") or {}
+                    if result.get("error") or response.get("status_code") != 200:
+                        errors.append(_batch_error_message(result))
+                        continue
+                    buffer.write(int(result["custom_id"]), [response["body"]["data"][0]["embedding"]])
+                    received += 1
+            if job.error_file_id:
+                errors.extend(_batch_error_message(result) for result in self._read_batch_file(job.error_file_id))
+
+        if received != len(texts):
+            detail = f": {'; '.join(errors)}" if errors else ""
+            raise RuntimeError(f"OpenAI batch jobs returned {received} of {len(texts)} embeddings{detail}")
+        return buffer.result()
+
+    def _read_batch_file(self, file_id: str) -> List[dict]:
+        """Parse the JSONL lines of a Batch API output or error file."""
+        text = self.client.files.content(file_id).text
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    @_retry_transient
+    def _create_with_retry(self, **kwargs):
+        """Call the embeddings endpoint, backing off on transient errors."""
+        return self.client.embeddings.create(**kwargs)
+
+    async def _embed_batches_async(self, texts: List[str], batch_size: int, buffer: EmbeddingBuffer):
+        """Embed all batches concurrently, writing each into ``buffer`` as it completes."""
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with openai.AsyncOpenAI(api_key=self.api_key) as client:
+
+            async def embed_one(offset: int):
+                async with semaphore:
+                    response = await _acreate_with_retry(
+                        client, input=texts[offset : offset + batch_size], model=self.model
+                    )
+                buffer.write(offset, [item.embedding for item in response.data])
+
+            await asyncio.gather(*(embed_one(offset) for offset in range(0, len(texts), batch_size)))
 
     @property
     def dimension(self) -> int:
@@ -70,4 +261,10 @@ class OpenAIEmbeddings(BaseEmbeddings):
     @property
     def model_name(self) -> str:
         """Return the name of the embedding model."""
-        return self.model
\ No newline at end of file
+        return self.model
+
+
+@_retry_transient
+async def _acreate_with_retry(client, **kwargs):
+    """Async counterpart of ``OpenAIEmbeddings._create_with_retry``."""
+    return await client.embeddings.create(**kwargs)
\ No newline at end of file
@@ -1,8 +1,140 @@
 """Local embedding generation using Sentence Transformers."""
 
+import multiprocessing
 import os
-from typing import List, Optional
-from .base_embeddings import BaseEmbeddings
+import threading
+import warnings
+import weakref
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
+import numpy as np
+from .base_embeddings import EMBED_CACHE_SIZE, BaseEmbeddings
+from .embedding_cache import EmbeddingCache
+
+
+class _MicroBatcher:
+    """Coalesce concurrent single-text encode calls into batched model calls.
+
+    A caller arriving while the model is idle runs a batch straight away, so a
+    lone caller pays no extra latency. Callers arriving while a batch is in
+    flight queue up and are served together by the next batch.
+    """
+
+    def __init__(self, encode_batch: Callable[[List[str]], Sequence], max_batch_size: int = 64):
+        self._encode_batch = encode_batch
+        self._max_batch_size = max_batch_size
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Future]] = []
+        self._running = False
+
+    def submit(self, text: str):
+        """Encode ``text``, possibly together with other concurrent callers."""
+        future: Future = Future()
+        with self._lock:
+            self._pending.append((text, future))
+            lead = not self._running
+            self._running = True
+
+        if lead:
+            self._drain()
+        return future.result()
+
+    def _drain(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                batch = self._pending[: self._max_batch_size]
+                del self._pending[: self._max_batch_size]
+
+            try:
+                vectors = self._encode_batch([text for text, _ in batch])
+            except BaseException as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), vector in zip(batch, vectors):
+                    future.set_result(vector)
+
+
+ONNX_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ragsystem", "onnx")
+
+# Model instance owned by each CPU worker process.
+_worker_model = None
+
+# Below this many texts an encode stays in-process even with num_workers > 1;
+# each worker loads its own copy of the model, which only pays off for bulk
+# ingestion.
+SHARD_MIN_TEXTS = 1024
+
+
+def _resolve_backend(backend: str) -> str:
+    """Return ``backend``, or 'torch' with a warning if ONNX can't be used here.
+
+    The ONNX backend needs optimum[onnxruntime] and sentence-transformers >= 3.2,
+    neither of which is a required dependency.
+    """
+    if backend != "onnx":
+        return backend
+    try:
+        import optimum.onnxruntime  # noqa: F401
+        import sentence_transformers.backend  # noqa: F401  (added in 3.2)
+    except ImportError:
+        warnings.warn(
+            "The ONNX backend needs optimum[onnxruntime] and sentence-transformers>=3.2; "
+            "falling back to the torch backend. Install them with: "
+            "uv add 'optimum[onnxruntime]' 'sentence-transformers>=3.2'",
+            stacklevel=3,
+        )
+        return "torch"
+    return backend
+
+
+@lru_cache(maxsize=4)
+def _load_model(model_name: str, device: Optional[str], backend: str, onnx_quantize: bool):
+    """Load a SentenceTransformer, exporting ONNX models once into ONNX_CACHE_DIR.
+
+    Loaded models are memoized, so several embeddings instances (e.g. one per
+    RAGSystem/collection) share one copy of the weights.
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name, device=device)
+    if backend != "onnx":
+        # The backend argument needs sentence-transformers >= 3.2
+        return SentenceTransformer(model_name, device=device, backend=backend)
+
+    path = os.path.join(ONNX_CACHE_DIR, model_name.replace("/", "__"))
+    if not os.path.isdir(path):
+        # Exports the PyTorch weights to ONNX (requires optimum[onnxruntime])
+        SentenceTransformer(model_name, device=device, backend="onnx").save_pretrained(path)
+
+    if not onnx_quantize:
+        return SentenceTransformer(path, device=device, backend="onnx")
+
+    file_name = "onnx/model_qint8_avx2.onnx"
+    if not os.path.exists(os.path.join(path, file_name)):
+        from sentence_transformers.backend import export_dynamic_quantized_onnx_model
+
+        model = SentenceTransformer(path, device=device, backend="onnx")
+        export_dynamic_quantized_onnx_model(model, "avx2", path)
+    return SentenceTransformer(path, device=device, backend="onnx", model_kwargs={"file_name": file_name})
+
+
+def _init_worker(model_name: str, backend: str, onnx_quantize: bool):
+    """Load the model once per worker, limited to one intra-op thread."""
+    global _worker_model
+    import torch
+
+    torch.set_num_threads(1)
+    _worker_model = _load_model(model_name, "cpu", backend, onnx_quantize)
+
+
+def _encode_shard(texts: List[str], batch_size: int):
+    return _worker_model.encode(texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
 
 
 class SentenceTransformerEmbeddings(BaseEmbeddings):
@@ -14,16 +146,35 @@ class SentenceTransformerEmbeddings(BaseEmbeddings):
     - multi-qa-mpnet-base-dot-v1: Optimized for Q&A (768 dimensions)
     """
 
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: Optional[str] = None):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", device: Optional[str] = None,
+                 quantize: bool = False, num_workers: Optional[int] = None, warmup: bool = True,
+                 backend: str = "torch", onnx_quantize: bool = False,
+                 cache: Optional[EmbeddingCache] = None):
         """
         Initialize Sentence Transformer embeddings.
 
         Args:
             model_name: HuggingFace model name
             device: Device to run on ('cuda', 'cpu', or None for auto)
+            quantize: Return int8-quantized vectors from `embed_batch_np`
+            num_workers: Worker processes to shard batches of at least
+                SHARD_MIN_TEXTS texts across on CPU (default 1: encode in this
+                process). Workers are spawned, each loads the model once, and
+                they live until `close()` or until this object is collected.
+            warmup: Run a dummy encode now so the first real query doesn't pay
+                for tokenizer/kernel initialization
+            backend: 'torch', 'onnx' or 'openvino'. 'onnx' is typically several
+                times faster on CPU; the exported model is cached under
+                ~/.cache/ragsystem/onnx. Needs optimum[onnxruntime] and
+                sentence-transformers>=3.2; without them 'torch' is used with
+                a warning
+            onnx_quantize: With the ONNX backend, use an int8 dynamically
+                quantized model
+            cache: Optional on-disk cache; only texts missing from it are encoded
+                by `embed_batch`/`embed_batch_np`
         """
         try:
-            from sentence_transformers import SentenceTransformer
+            import sentence_transformers  # noqa: F401
         except ImportError:
             raise ImportError(
                 "sentence-transformers is required for local embeddings. "
@@ -32,15 +183,42 @@ class SentenceTransformerEmbeddings(BaseEmbeddings):
 
         self._model_name = model_name
         self.device = device
-        self.model = SentenceTransformer(model_name, device=device)
+        self.quantize = quantize
+        self.backend = _resolve_backend(backend)
+        self.onnx_quantize = onnx_quantize and self.backend == "onnx"
+        self.cache = cache
+        self.model = _load_model(model_name, device, self.backend, self.onnx_quantize)
 
         # Get embedding dimension from model
         self._dimension = self.model.get_sentence_embedding_dimension()
 
+        self.num_workers = num_workers or 1
+        self._pool = None
+        self._pool_finalizer = None
+
+        self._batcher = _MicroBatcher(self._encode_batch)
+        self._embed_cached = lru_cache(maxsize=EMBED_CACHE_SIZE)(self._embed_uncached)
+
+        if warmup:
+            self.model.encode(["warmup"], convert_to_numpy=True, show_progress_bar=False)
+
+    def _encode_batch(self, texts: List[str]):
+        return self.model.encode(texts, batch_size=64, convert_to_numpy=True, show_progress_bar=False)
+
     def embed(self, text: str) -> List[float]:
-        """Generate embedding for a single text."""
-        embedding = self.model.encode(text, convert_to_numpy=True)
-        return embedding.tolist()
+        """Generate embedding for a single text.
+
+        Repeats hit an in-memory LRU cache, and concurrent callers (e.g. several
+        Gradio requests) are fused into one batched ``encode`` call.
+        """
+        return list(self._embed_cached(text))
+
+    def _embed_uncached(self, text: str) -> Tuple[float, ...]:
+        return tuple(self._batcher.submit(text).tolist())
+
+    def clear_cache(self):
+        """Drop the in-memory cache of single-text embeddings."""
+        self._embed_cached.cache_clear()
 
     def embed_batch(self, texts: List[str], batch_size: int = 32) -> List[List[float]]:
         """
@@ -48,13 +226,67 @@ class SentenceTransformerEmbeddings(BaseEmbeddings):
 
         Note: batch_size is typically smaller for local models due to memory constraints.
         """
-        embeddings = self.model.encode(
-            texts,
-            batch_size=batch_size,
-            convert_to_numpy=True,
-            show_progress_bar=len(texts) > 100
-        )
-        return embeddings.tolist()
+        return self._encode_many(texts, batch_size).tolist()
+
+    def embed_batch_np(self, texts: List[str], batch_size: int = 32):
+        """Generate embeddings for multiple texts as a float32 (or int8, if quantizing) array."""
+        return self._maybe_quantize(np.ascontiguousarray(self._encode_many(texts, batch_size), dtype=np.float32))
+
+    def _encode_many(self, texts: List[str], batch_size: int):
+        if self.cache is not None:
+            # Different backends/quantization give slightly different vectors
+            cache_model = self._model_name
+            if self.backend != "torch":
+                cache_model += f"@{self.backend}" + ("-qint8" if self.onnx_quantize else "")
+            return self.cache.embed_through(
+                cache_model, texts, lambda missing: self._encode_uncached(missing, batch_size)
+            )
+        return self._encode_uncached(texts, batch_size)
+
+    def _encode_uncached(self, texts: List[str], batch_size: int):
+        if self.num_workers <= 1 or len(texts) < max(SHARD_MIN_TEXTS, batch_size + 1):
+            return self.model.encode(
+                texts,
+                batch_size=batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=len(texts) > 100
+            )
+
+        # Encode the first batch here so model/input errors surface
+        # immediately, then scatter the rest across the worker pool.
+        head = self.model.encode(texts[:batch_size], batch_size=batch_size, convert_to_numpy=True,
+                                 show_progress_bar=False)
+        rest = texts[batch_size:]
+        shard_size = -(-len(rest) // self.num_workers)
+        shards = [rest[i : i + shard_size] for i in range(0, len(rest), shard_size)]
+
+        if self._pool is None:
+            # Spawn rather than fork: this process already runs torch's
+            # threads, and forking a multi-threaded process can deadlock
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._model_name, self.backend, self.onnx_quantize),
+            )
+            # Shut the workers down when this object is garbage collected
+            # (or at interpreter exit) if close() is never called
+            self._pool_finalizer = weakref.finalize(self, self._pool.shutdown)
+        parts = self._pool.map(_encode_shard, shards, [batch_size] * len(shards))
+        return np.concatenate([head, *parts])
+
+    def close(self):
+        """Shut down the CPU worker pool, if one was started."""
+        if self._pool_finalizer is not None:
+            self._pool_finalizer()
+            self._pool_finalizer = None
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     @property
     def dimension(self) -> int:
@@ -1,8 +1,55 @@
 """Voyage AI embedding generation."""
 
+import asyncio
 import os
-from typing import List, Optional
-from .base_embeddings import BaseEmbeddings
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+from .base_embeddings import (
+    EMBED_CACHE_SIZE,
+    BaseEmbeddings,
+    EmbeddingBuffer,
+    embed_unique,
+    fit_batch_size,
+    run_coroutine,
+)
+from .embedding_cache import EmbeddingCache
+
+
+def _is_transient(exc: BaseException) -> bool:
+    """Rate limits, timeouts and server-side errors are worth retrying."""
+    from voyageai import error
+
+    return isinstance(exc, (
+        error.RateLimitError,
+        error.ServiceUnavailableError,
+        error.ServerError,
+        error.APIConnectionError,
+        error.Timeout,
+        error.TryAgain,
+    ))
+
+
+_backoff = wait_random_exponential(min=1, max=20)
+
+
+def _wait_retry_after(retry_state) -> float:
+    """Honour the server's Retry-After header, else back off exponentially."""
+    headers = getattr(retry_state.outcome.exception(), "headers", None) or {}
+    retry_after = headers.get("retry-after") or headers.get("Retry-After")
+    try:
+        return float(retry_after)
+    except (TypeError, ValueError):
+        return _backoff(retry_state)
+
+
+_retry_transient = retry(
+    wait=_wait_retry_after,
+    stop=stop_after_attempt(5),
+    retry=retry_if_exception(_is_transient),
+    reraise=True,
+)
 
 
 class VoyageEmbeddings(BaseEmbeddings):
@@ -16,6 +63,9 @@ class VoyageEmbeddings(BaseEmbeddings):
     - voyage-law-2: Domain-specific for legal (1024 dimensions)
     """
 
+    # Per-request token limit (the tightest across current Voyage models)
+    TOKEN_LIMIT = 120_000
+
     # Model dimensions mapping
     MODEL_DIMENSIONS = {
         "voyage-3": 1024,
@@ -27,13 +77,18 @@ class VoyageEmbeddings(BaseEmbeddings):
         "voyage-lite-02-instruct": 1024,
     }
 
-    def __init__(self, api_key: Optional[str] = None, model: str = "voyage-3"):
+    def __init__(self, api_key: Optional[str] = None, model: str = "voyage-3",
+                 cache: Optional[EmbeddingCache] = None, quantize: bool = False,
+                 max_concurrency: int = 8):
         """
         Initialize Voyage embeddings.
 
         Args:
             api_key: Voyage API key (falls back to VOYAGE_API_KEY env var)
             model: Voyage model to use
+            cache: Optional on-disk cache; only texts missing from it hit the API
+            quantize: Return int8-quantized vectors from `embed_batch_np`
+            max_concurrency: Maximum number of batch requests in flight at once
         """
         try:
             import voyageai
@@ -45,7 +100,11 @@ class VoyageEmbeddings(BaseEmbeddings):
 
         self.api_key = api_key or os.getenv("VOYAGE_API_KEY")
         self.model = model
+        self.cache = cache
+        self.quantize = quantize
+        self.max_concurrency = max_concurrency
         self.client = None
+        self._embed_cached = lru_cache(maxsize=EMBED_CACHE_SIZE)(self._embed_uncached)
 
         if not self.api_key:
             raise ValueError(
@@ -55,24 +114,98 @@ class VoyageEmbeddings(BaseEmbeddings):
         self.client = voyageai.Client(api_key=self.api_key)
 
     def embed(self, text: str) -> List[float]:
-        """Generate embedding for a single text."""
-        result = self.client.embed([text], model=self.model)
-        return result.embeddings[0]
+        """Generate embedding for a single text (repeats hit an in-memory LRU cache)."""
+        return list(self._embed_cached(self.model, text))
+
+    def _embed_uncached(self, model: str, text: str) -> Tuple[float, ...]:
+        if self.cache is not None:
+            return tuple(self._embed_batch_float([text])[0].tolist())
+        result = self._embed_with_retry([text], model=model)
+        return tuple(result.embeddings[0])
+
+    def clear_cache(self):
+        """Drop the in-memory cache of single-text embeddings."""
+        self._embed_cached.cache_clear()
 
     def embed_batch(self, texts: List[str], batch_size: int = 128) -> List[List[float]]:
         """
         Generate embeddings for multiple texts in batches.
 
-        Voyage AI supports up to 128 texts per request.
+        Voyage AI supports up to 128 texts per request. See `embed_batch_np`
+        for the array form.
         """
-        embeddings: List[List[float]] = []
+        return self._embed_batch_float(texts, batch_size).tolist()
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i : i + batch_size]
-            result = self.client.embed(batch, model=self.model)
-            embeddings.extend(result.embeddings)
+    def embed_batch_np(self, texts: List[str], batch_size: int = 128) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts as a float32 array.
+
+        When the input spans more than one batch, the requests are sent
+        concurrently (bounded by ``max_concurrency``). Each response is copied
+        into a preallocated array at its input offset. With a cache
+        configured only uncached texts are sent. Returns int8 vectors when
+        ``quantize`` is set.
+        """
+        return self._maybe_quantize(self._embed_batch_float(texts, batch_size))
 
-        return embeddings
+    def _embed_batch_float(self, texts: List[str], batch_size: int = 128) -> np.ndarray:
+        """Float32 embeddings for ``texts``, going through the cache if configured.
+
+        Duplicate texts are sent once; blank texts raise ValueError.
+        """
+        def embed_fn(unique: List[str]) -> np.ndarray:
+            if self.cache is not None:
+                return self.cache.embed_through(
+                    self.model, unique, lambda missing: self._embed_batch_uncached(missing, batch_size)
+                )
+            return self._embed_batch_uncached(unique, batch_size)
+
+        return embed_unique(texts, embed_fn, self.dimension)
+
+    def _embed_batch_uncached(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Embed ``texts`` via the API, bypassing the cache."""
+        batch_size = fit_batch_size(texts, batch_size, self.TOKEN_LIMIT)
+        buffer = EmbeddingBuffer(len(texts), self.dimension)
+        offsets = range(0, len(texts), batch_size)
+        if len(offsets) <= 1:
+            for offset in offsets:
+                result = self._embed_with_retry(texts[offset : offset + batch_size], model=self.model)
+                buffer.write(offset, result.embeddings)
+        else:
+            run_coroutine(self._embed_batches_async(texts, batch_size, buffer))
+        return buffer.result()
+
+    async def _embed_batches_async(self, texts: List[str], batch_size: int, buffer: EmbeddingBuffer):
+        """Embed all batches concurrently, writing each into ``buffer`` as it completes.
+
+        The client and its aiohttp session live only as long as this coroutine:
+        each call runs on its own event loop (see `run_coroutine`), and the
+        session is closed before that loop is.
+        """
+        import aiohttp
+        import voyageai
+
+        client = voyageai.AsyncClient(api_key=self.api_key)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def embed_one(offset: int):
+            async with semaphore:
+                result = await _aembed_with_retry(client, texts[offset : offset + batch_size], model=self.model)
+            buffer.write(offset, result.embeddings)
+
+        # voyageai otherwise opens (and closes) a session per request; sharing
+        # one keeps connections alive across the batches of this call
+        async with aiohttp.ClientSession() as session:
+            token = voyageai.aiosession.set(session)
+            try:
+                await asyncio.gather(*(embed_one(offset) for offset in range(0, len(texts), batch_size)))
+            finally:
+                voyageai.aiosession.reset(token)
+
+    @_retry_transient
+    def _embed_with_retry(self, texts: List[str], model: str):
+        """Call the embed endpoint, backing off on rate limits and transient errors."""
+        return self.client.embed(texts, model=model)
 
     @property
     def dimension(self) -> int:
@@ -83,3 +216,9 @@ class VoyageEmbeddings(BaseEmbeddings):
     def model_name(self) -> str:
         """Return the name of the embedding model."""
         return self.model
+
+
+@_retry_transient
+async def _aembed_with_retry(client, texts: List[str], model: str):
+    """Async counterpart of ``VoyageEmbeddings._embed_with_retry``."""
+    return await client.embed(texts, model=model)
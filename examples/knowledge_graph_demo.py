@@ -10,8 +10,11 @@ The key insight: Graph relationships are stored as metadata,
 while embeddings (from ANY provider) are used for semantic search.
 """
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 from ragsystem.graph_rag import GraphRAGSystem
-from embeddings import SentenceTransformerEmbeddings, VoyageEmbeddings, OpenAIEmbeddings
+from embeddings import EmbeddingCache, SentenceTransformerEmbeddings
 from ragsystem.knowledge_graph import GraphVisualizer
 
 
@@ -21,8 +24,11 @@ def demo_graph_with_local_embeddings():
     print("Demo 1: Knowledge Graph with Local Embeddings (FREE!)")
     print("=" * 70)
 
-    # Create local embeddings
-    local_emb = SentenceTransformerEmbeddings("all-MiniLM-L6-v2")
+    # Create local embeddings; the on-disk cache skips re-encoding the sample
+    # documents on later runs
+    local_emb = SentenceTransformerEmbeddings(
+        "all-MiniLM-L6-v2", backend="onnx", onnx_quantize=True, cache=EmbeddingCache()
+    )
 
     # Create Graph RAG with local embeddings
     graph_rag = GraphRAGSystem(
@@ -52,11 +58,11 @@ def demo_graph_with_local_embeddings():
         }
     ]
 
-    chunks_added = graph_rag._process_documents(sample_data)
+    chunks_added = graph_rag.add_documents_bulk(sample_data, batch_size=1024)
     print(f"✅ Added {chunks_added} chunks with graph extraction")
 
     # Get graph statistics
-    stats = graph_rag.get_stats()
+    stats = graph_rag.get_stats(top_k=5)
     print(f"\n📊 Graph Statistics:")
     print(f"   Embedding Model: {stats['embedding_model']}")
     print(f"   Embedding Dimensions: {stats['embedding_dimension']}")
@@ -66,7 +72,7 @@ def demo_graph_with_local_embeddings():
     # Show top entities
     if stats['top_entities']:
         print(f"\n🔝 Top Entities:")
-        for entity, count in stats['top_entities'][:5]:
+        for entity, count in stats['top_entities']:
             print(f"   • {entity}: {count} occurrences")
 
     # Semantic search (using local embeddings!)
@@ -110,7 +116,15 @@ def demo_graph_with_voyage_embeddings():
     print("Demo 2: Knowledge Graph with Voyage AI Embeddings")
     print("=" * 70)
 
+    # Bail out before importing the Voyage SDK at all when there is no key
+    if not os.environ.get("VOYAGE_API_KEY"):
+        print("\n⚠️  Voyage AI not configured, skipping")
+        print("   Set VOYAGE_API_KEY in .env to use Voyage embeddings")
+        return
+
     try:
+        from embeddings import VoyageEmbeddings
+
         # Create Voyage embeddings
         voyage_emb = VoyageEmbeddings("voyage-3")
 
@@ -156,9 +170,10 @@ def demo_visualization(graph_rag: GraphRAGSystem):
     # Mermaid diagram
     print("\n📝 Mermaid Diagram (copy to https://mermaid.live):")
     entity_list = list(entities.keys())[:10]  # Limit for readability
+    entity_set = set(entity_list)
     filtered_relations = [
         (s, r, t) for s, r, t in relations
-        if s in entity_list and t in entity_list
+        if s in entity_set and t in entity_set
     ]
     mermaid = GraphVisualizer.to_mermaid(entity_list, filtered_relations)
     print(mermaid)
@@ -177,7 +192,7 @@ def demo_visualization(graph_rag: GraphRAGSystem):
     print(f"\n📦 Cytoscape.js data generated: {len(cyto_data['nodes'])} nodes, {len(cyto_data['edges'])} edges")
 
 
-def compare_embeddings_with_graphs():
+def compare_embeddings_with_graphs(local_rag: GraphRAGSystem):
     """Compare how different embeddings work with the same knowledge graph"""
     print("\n\n" + "=" * 70)
     print("Demo 4: Compare Embeddings with Knowledge Graphs")
@@ -190,12 +205,6 @@ def compare_embeddings_with_graphs():
 
     # Test with local embeddings
     print("\n1️⃣  Local Embeddings (Sentence Transformers):")
-    local_emb = SentenceTransformerEmbeddings("all-MiniLM-L6-v2")
-    local_rag = GraphRAGSystem(
-        embeddings=local_emb,
-        persist_directory="./demo_graph_local",
-        collection_name="graph_local_demo"
-    )
     local_results = local_rag.search(query, top_k=2)
     if local_results:
         print(f"   Top result: {local_results[0]['content'][:80]}...")
@@ -219,20 +228,25 @@ def main():
     print("=" * 70)
 
     # Create outputs directory
-    import os
     os.makedirs("outputs", exist_ok=True)
 
-    # Demo 1: Local embeddings + Knowledge graph
-    graph_rag = demo_graph_with_local_embeddings()
+    # Demos 1 and 2 are independent (separate persist directories), so run the
+    # network-bound Voyage demo in a worker process while the local model
+    # runs here. Their output may interleave.
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        # Demo 2: Voyage embeddings + Knowledge graph
+        voyage_demo = pool.submit(demo_graph_with_voyage_embeddings)
+
+        # Demo 1: Local embeddings + Knowledge graph
+        graph_rag = demo_graph_with_local_embeddings()
 
-    # Demo 2: Voyage embeddings + Knowledge graph
-    demo_graph_with_voyage_embeddings()
+        voyage_demo.result()
 
     # Demo 3: Visualization
     demo_visualization(graph_rag)
 
     # Demo 4: Compare embeddings
-    compare_embeddings_with_graphs()
+    compare_embeddings_with_graphs(graph_rag)
 
     print("\n\n" + "=" * 70)
     print("✨ All demonstrations complete!")
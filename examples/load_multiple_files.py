@@ -1,16 +1,12 @@
 """Example: Load multiple files from data folder into ChromaDB.
 
 Run this from the project root:
-    uv run python examples/load_multiple_files.py
+    uv run python -m examples.load_multiple_files
 """
 
 import os
-import sys
 from datetime import datetime
 
-# Add parent directory to path so we can import ragsystem
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
 from ragsystem import RAGSystem
 
 # Create outputs directory if it doesn't exist
@@ -76,16 +72,16 @@ with open(output_file, 'w') as f:
     f.write(f"Total chunks: {summary['added_chunks']}\n")
     f.write(f"Total documents: {stats['total_documents']}\n\n")
 
+    parts = []
     for i, question in enumerate(queries, 1):
         print(f"Query {i}: {question}")
         answer = rag.query(question, top_k=5, max_tokens=300)
         print(f"Answer: {answer}\n")
 
-        f.write(f"\n--- QUERY {i} ---\n")
-        f.write(f"Q: {question}\n")
-        f.write(f"A: {answer}\n")
+        parts.append(f"\n--- QUERY {i} ---\nQ: {question}\nA: {answer}\n")
 
-    f.write("\n" + "="*80 + "\n")
+    parts.append("\n" + "="*80 + "\n")
+    f.write("".join(parts))
 
 print(f"✓ Analysis saved to: {output_file}")
 
@@ -97,23 +93,20 @@ with open(manifest_file, 'w') as f:
     f.write(f"ChromaDB Location: outputs/chroma_db\n")
     f.write(f"Total Chunks: {summary['added_chunks']}\n\n")
 
-    # List all files in data directory
+    # Files and sizes were collected by load_file; no second directory walk
     f.write("Files processed from data/:\n")
-    for root, dirs, files in os.walk('data/'):
-        for file in files:
-            filepath = os.path.join(root, file)
-            file_size = os.path.getsize(filepath)
-            f.write(f"  ✓ {filepath} ({file_size:,} bytes)\n")
+    f.write("".join(
+        f"  ✓ {filepath} ({file_size:,} bytes)\n"
+        for filepath, file_size in summary['processed_files']
+    ))
 
     if summary.get('skipped_files'):
         f.write(f"\nSkipped files:\n")
-        for file in summary['skipped_files']:
-            f.write(f"  ⚠ {file}\n")
+        f.write("".join(f"  ⚠ {file}\n" for file in summary['skipped_files']))
 
     if summary.get('errors'):
         f.write(f"\nErrors:\n")
-        for error in summary['errors']:
-            f.write(f"  ❌ {error['file']}: {error['error']}\n")
+        f.write("".join(f"  ❌ {error['file']}: {error['error']}\n" for error in summary['errors']))
 
 print(f"✓ Manifest saved to: {manifest_file}")
 
@@ -7,20 +7,25 @@ This shows how to:
 - List all collections
 
 Run this from the project root:
-    uv run python examples/manage_collections.py
+    uv run python -m examples.manage_collections
 """
 
 import os
-import sys
 from datetime import datetime
 
-# Add parent directory to path so we can import ragsystem
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-
-from ragsystem import RAGSystem
+from ragsystem import RAGSystem, get_client
+from embeddings import OpenAIEmbeddings
 
 os.makedirs('outputs', exist_ok=True)
 
+# One embedding provider shared by every RAGSystem below, so the client and
+# its query cache are created once rather than per collection
+embeddings = OpenAIEmbeddings()
+
+# Likewise one ChromaDB client for the whole database; every collection below
+# is opened through it
+client = get_client("outputs/chroma_db")
+
 print("="*80)
 print("CHROMADB COLLECTION MANAGEMENT")
 print("="*80 + "\n")
@@ -33,7 +38,9 @@ print("-"*80 + "\n")
 print("Creating 'finance_docs' collection...")
 rag_finance = RAGSystem(
     persist_directory="outputs/chroma_db",
-    collection_name="finance_docs"
+    collection_name="finance_docs",
+    embeddings=embeddings,
+    client=client
 )
 print(f"  Documents in finance_docs: {len(rag_finance.vector_store)}")
 
@@ -41,7 +48,9 @@ print(f"  Documents in finance_docs: {len(rag_finance.vector_store)}")
 print("\nCreating 'research_papers' collection...")
 rag_research = RAGSystem(
     persist_directory="outputs/chroma_db",
-    collection_name="research_papers"
+    collection_name="research_papers",
+    embeddings=embeddings,
+    client=client
 )
 print(f"  Documents in research_papers: {len(rag_research.vector_store)}")
 
@@ -49,7 +58,9 @@ print(f"  Documents in research_papers: {len(rag_research.vector_store)}")
 print("\nCreating default 'rag_documents' collection...")
 rag_default = RAGSystem(
     persist_directory="outputs/chroma_db",
-    collection_name="rag_documents"
+    collection_name="rag_documents",
+    embeddings=embeddings,
+    client=client
 )
 print(f"  Documents in rag_documents: {len(rag_default.vector_store)}")
 
@@ -57,7 +68,7 @@ print(f"  Documents in rag_documents: {len(rag_default.vector_store)}")
 print("\n" + "="*80)
 print("All Collections in Database:")
 print("="*80)
-collections = rag_default.vector_store.get_collections()
+collections = [col.name for col in client.list_collections()]
 for i, col in enumerate(collections, 1):
     print(f"{i}. {col}")
 
@@ -104,19 +115,21 @@ print("="*80 + "\n")
 print("Creating temporary collection 'temp_collection'...")
 rag_temp = RAGSystem(
     persist_directory="outputs/chroma_db",
-    collection_name="temp_collection"
+    collection_name="temp_collection",
+    embeddings=embeddings,
+    client=client
 )
 
 print("\nCollections before delete:")
-collections_before = rag_default.vector_store.get_collections()
+collections_before = [col.name for col in client.list_collections()]
 for col in collections_before:
     print(f"  - {col}")
 
 print("\nDeleting 'temp_collection'...")
-rag_temp.vector_store.delete_collection("temp_collection")
+client.delete_collection(name="temp_collection")
 
 print("\nCollections after delete:")
-collections_after = rag_default.vector_store.get_collections()
+collections_after = [col.name for col in client.list_collections()]
 for col in collections_after:
     print(f"  - {col}")
 
@@ -136,6 +149,7 @@ best_practices = """
 
 3. **Persistence**
    - All collections in the same persist_directory share the same database
+   - Pass one client (get_client(persist_directory)) to every RAGSystem
    - Collections persist automatically - no manual save needed
 
 4. **Clearing vs Deleting**
@@ -163,8 +177,7 @@ with open(output_file, 'w') as f:
     f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
     f.write(f"Database Location: outputs/chroma_db\n\n")
     f.write("Collections:\n")
-    for col in collections_after:
-        f.write(f"  - {col}\n")
+    f.write("".join(f"  - {col}\n" for col in collections_after))
     f.write("\n" + best_practices)
     f.write("\n" + "="*80 + "\n")
 
@@ -3,7 +3,7 @@
 
 Three tests provided as functions so they can be invoked individually or from CI:
 - minimal_smoke(): runs the `main.py` entry to confirm no syntax/import errors.
-- functional_smoke(): exercises `TextChunker` and `VectorStore` (offline, requires numpy & scikit-learn).
+- functional_smoke(): exercises `TextChunker` and `VectorStore` (offline, requires numpy).
 - rag_instantiate_smoke(): instantiates `RAGSystem` without making network calls (conservative).
 
 Run examples from project root:
@@ -39,7 +39,7 @@ def minimal_smoke() -> bool:
 def functional_smoke() -> bool:
 	"""Test TextChunker and VectorStore basic behavior.
 
-	This is an offline test but requires numpy and scikit-learn to be installed.
+	This is an offline test but requires numpy to be installed.
 	Returns True on success, False on failure.
 	"""
 	try:
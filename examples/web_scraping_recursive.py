@@ -14,25 +14,61 @@ Usage:
     uv run python examples/web_scraping_recursive.py
 """
 
+import hashlib
+import json
 import os
+import re
 import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Set
+from typing import Deque, Iterable, List, Optional, Set, Tuple, Union
 from urllib.parse import urljoin, urlparse
+from urllib.robotparser import RobotFileParser
 import time
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ragsystem import RAGSystem
+from embeddings import EmbeddingCache, OpenAIEmbeddings
+from loaders.web_loader import make_session
 import requests
 from bs4 import BeautifulSoup
 
+# Link extraction is the CPU hotspot once fetching is concurrent; use the
+# fastest available HTML parser (uv add selectolax), then lxml, then the
+# pure-Python html.parser.
+try:
+    from selectolax.parser import HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    from lxml.etree import HTMLPullParser
+    BS4_PARSER = 'lxml'
+except ImportError:
+    HTMLPullParser = None
+    BS4_PARSER = 'html.parser'
+
+
+CRAWL_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ragsystem", "crawl")
+
 
 class RecursiveWebCrawler:
     """Recursively crawl a website."""
 
-    def __init__(self, base_url: str, max_depth: int = 2, max_pages: int = 50, delay: float = 1.0):
+    # Common non-content pages, matched anywhere in the URL
+    _SKIP_RE = re.compile(
+        r'/login|/signin|/signup|/register|/cart|/checkout|/account'
+        r'|\.pdf|\.jpe?g|\.png|\.gif|\.zip|\.tar|\.gz'
+        r'|#|javascript:|mailto:',
+        re.IGNORECASE,
+    )
+
+    def __init__(self, base_url: str, max_depth: int = 2, max_pages: int = 50, delay: float = 1.0,
+                 max_workers: int = 8, use_cache: bool = True):
         """
         Initialize crawler.
 
@@ -40,18 +76,75 @@ class RecursiveWebCrawler:
             base_url: Starting URL (e.g., https://example.com)
             max_depth: Maximum depth to crawl (0 = only base, 1 = base + direct links, etc.)
             max_pages: Maximum total pages to crawl
-            delay: Delay between requests in seconds (be respectful!)
+            delay: Minimum time between request starts in seconds (be respectful!)
+            max_workers: Pages fetched concurrently within one depth level
+            use_cache: Remember each page's ETag/Last-Modified and links in
+                CRAWL_CACHE_DIR; later crawls send conditional GETs and reuse
+                the links of pages that answer 304 Not Modified
         """
         self.base_url = base_url
         self.domain = urlparse(base_url).netloc
         self.max_depth = max_depth
         self.max_pages = max_pages
         self.delay = delay
+        self.max_workers = max_workers
 
         self.visited: Set[str] = set()
-        self.to_visit: List[tuple] = [(base_url, 0)]  # (url, depth)
+        self.to_visit: Deque[Tuple[str, int]] = deque([(base_url, 0)])  # (url, depth)
+        # Every URL ever queued; links are deduplicated against it when queued,
+        # so the frontier holds each URL at most once
+        self.enqueued: Set[str] = {base_url}
         self.failed: List[dict] = []
 
+        # One pooled session (with 429/5xx retries) so concurrent workers
+        # reuse connections
+        self.session = make_session(max_workers)
+
+        # Rate limiter: request starts are spaced `delay` seconds apart
+        # across all workers, replacing the fixed sleep after every page
+        self._rate_lock = threading.Lock()
+        self._next_request_at = 0.0
+
+        # Honour robots.txt, so disallowed pages are skipped before any
+        # request (and don't draw 429s that burn the retry budget)
+        self._robots = self._read_robots()
+        crawl_delay = self._robots.crawl_delay('*')
+        if crawl_delay:
+            self.delay = max(self.delay, float(crawl_delay))
+
+        # url -> {'etag', 'last_modified', 'links'} from previous crawls
+        self.use_cache = use_cache
+        key = hashlib.sha256(self.domain.encode()).hexdigest()
+        self._cache_path = os.path.join(CRAWL_CACHE_DIR, f"{key}.json")
+        self._page_cache = {}
+        if use_cache and os.path.exists(self._cache_path):
+            with open(self._cache_path, encoding='utf-8') as f:
+                self._page_cache = json.load(f)
+
+    def _read_robots(self) -> RobotFileParser:
+        """Fetch robots.txt with the crawl session (missing = allow all)."""
+        robots = RobotFileParser(urljoin(self.base_url, '/robots.txt'))
+        try:
+            response = self.session.get(robots.url, timeout=10)
+        except requests.RequestException:
+            robots.allow_all = True
+            return robots
+
+        if response.status_code in (401, 403):
+            robots.disallow_all = True
+        elif response.status_code >= 400:
+            robots.allow_all = True
+        else:
+            robots.parse(response.text.splitlines())
+        return robots
+
+    def _save_cache(self):
+        """Write the page cache, via a temporary file so it is never truncated."""
+        os.makedirs(CRAWL_CACHE_DIR, exist_ok=True)
+        with open(self._cache_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self._page_cache, f)
+        os.replace(self._cache_path + ".tmp", self._cache_path)
+
     def is_valid_url(self, url: str) -> bool:
         """Check if URL should be crawled."""
         parsed = urlparse(url)
@@ -61,28 +154,43 @@ class RecursiveWebCrawler:
             return False
 
         # Skip common non-content pages
-        skip_patterns = [
-            '/login', '/signin', '/signup', '/register',
-            '/cart', '/checkout', '/account',
-            '.pdf', '.jpg', '.jpeg', '.png', '.gif',
-            '.zip', '.tar', '.gz',
-            '#', 'javascript:', 'mailto:'
-        ]
-
-        url_lower = url.lower()
-        for pattern in skip_patterns:
-            if pattern in url_lower:
-                return False
+        if self._SKIP_RE.search(url):
+            return False
+
+        if not self._robots.can_fetch('*', url):
+            return False
 
         return True
 
-    def get_links(self, url: str, html: str) -> List[str]:
-        """Extract links from HTML."""
-        soup = BeautifulSoup(html, 'html.parser')
+    def get_links(self, url: str, html: Union[str, bytes]) -> List[str]:
+        """Extract links from HTML (text or raw bytes)."""
+        if HTMLParser is not None:
+            hrefs = [node.attributes.get('href') for node in HTMLParser(html).css('a[href]')]
+        else:
+            hrefs = [a['href'] for a in BeautifulSoup(html, BS4_PARSER).find_all('a', href=True)]
+
+        return self._resolve_links(url, hrefs)
+
+    def _stream_links(self, url: str, response: requests.Response) -> List[str]:
+        """Extract links with lxml's pull parser while the body downloads."""
+        parser = HTMLPullParser(events=('start',))
+        hrefs = []
+
+        for chunk in response.iter_content(64 * 1024):
+            parser.feed(chunk)
+            hrefs.extend(el.get('href') for _, el in parser.read_events() if el.tag == 'a')
+        parser.close()
+        hrefs.extend(el.get('href') for _, el in parser.read_events() if el.tag == 'a')
+
+        return self._resolve_links(url, hrefs)
+
+    def _resolve_links(self, url: str, hrefs: Iterable[Optional[str]]) -> List[str]:
+        """Turn raw href values into absolute, crawlable URLs."""
         links = []
 
-        for a in soup.find_all('a', href=True):
-            href = a['href']
+        for href in hrefs:
+            if not href:
+                continue
             # Convert relative URLs to absolute
             absolute_url = urljoin(url, href)
             # Remove fragments
@@ -93,59 +201,112 @@ class RecursiveWebCrawler:
 
         return list(set(links))  # Deduplicate
 
+    def _wait_for_slot(self):
+        """Block until this worker may start its next request."""
+        with self._rate_lock:
+            now = time.monotonic()
+            start = max(now, self._next_request_at)
+            self._next_request_at = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+    def _fetch(self, url: str, depth: int) -> List[str]:
+        """Fetch one page and return its links (runs in a worker thread)."""
+        headers = {}
+        cached = self._page_cache.get(url) if self.use_cache else None
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        self._wait_for_slot()
+        with self.session.get(url, timeout=10, stream=True, headers=headers) as response:
+            # Unchanged since the last crawl: no body, reuse its links
+            if response.status_code == 304:
+                return [link for link in cached['links'] if self.is_valid_url(link)]
+
+            response.raise_for_status()
+
+            # Pages at max depth only need to be reachable; skip the body
+            if depth >= self.max_depth:
+                return []
+
+            # Extract links as the body arrives when lxml is the best parser
+            # available; otherwise hand the parser the raw bytes (it sniffs
+            # the encoding), avoiding a decoded copy of the page
+            if HTMLParser is None and HTMLPullParser is not None:
+                links = self._stream_links(url, response)
+            else:
+                links = self.get_links(url, response.content)
+
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if self.use_cache and (etag or last_modified):
+                self._page_cache[url] = {'etag': etag, 'last_modified': last_modified, 'links': links}
+            return links
+
     def crawl(self) -> List[str]:
         """
         Crawl the website.
 
+        Pages are crawled breadth-first, one depth level at a time; the pages
+        of a level are fetched and parsed concurrently.
+
         Returns:
             List of successfully crawled URLs
         """
         print(f"🕷️  Starting recursive crawl from: {self.base_url}")
         print(f"   Max depth: {self.max_depth}")
         print(f"   Max pages: {self.max_pages}")
-        print(f"   Delay: {self.delay}s between requests\n")
+        print(f"   Delay: {self.delay}s between requests ({self.max_workers} workers)\n")
 
         crawled_urls = []
 
-        while self.to_visit and len(self.visited) < self.max_pages:
-            url, depth = self.to_visit.pop(0)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while self.to_visit and len(self.visited) < self.max_pages:
+                depth = self.to_visit[0][1]
 
-            # Skip if already visited
-            if url in self.visited:
-                continue
-
-            # Skip if max depth exceeded
-            if depth > self.max_depth:
-                continue
+                # Skip if max depth exceeded
+                if depth > self.max_depth:
+                    break
 
-            # Mark as visited
-            self.visited.add(url)
+                # Take the rest of this level, up to the page limit
+                batch = []
+                while (self.to_visit and self.to_visit[0][1] == depth
+                       and len(self.visited) < self.max_pages):
+                    url, _ = self.to_visit.popleft()
 
-            # Crawl the page
-            try:
-                print(f"[{len(self.visited)}/{self.max_pages}] Depth {depth}: {url}")
+                    # Mark as visited
+                    self.visited.add(url)
+                    batch.append(url)
 
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
+                futures = [pool.submit(self._fetch, url, depth) for url in batch]
 
-                # Extract links if not at max depth
-                if depth < self.max_depth:
-                    links = self.get_links(url, response.text)
-                    print(f"  → Found {len(links)} links")
+                # Collect results in submission order, so the crawl order
+                # stays deterministic
+                for url, future in zip(batch, futures):
+                    print(f"[{len(crawled_urls) + len(self.failed) + 1}/{self.max_pages}] Depth {depth}: {url}")
+                    try:
+                        links = future.result()
+                    except Exception as e:
+                        print(f"  ❌ Failed: {str(e)[:50]}")
+                        self.failed.append({'url': url, 'error': str(e)})
+                        continue
 
-                    # Add new links to queue
-                    for link in links:
-                        if link not in self.visited:
-                            self.to_visit.append((link, depth + 1))
+                    if depth < self.max_depth:
+                        print(f"  → Found {len(links)} links")
 
-                crawled_urls.append(url)
+                        # Add new links to queue
+                        for link in links:
+                            if link not in self.enqueued:
+                                self.enqueued.add(link)
+                                self.to_visit.append((link, depth + 1))
 
-                # Be respectful - delay between requests
-                time.sleep(self.delay)
+                    crawled_urls.append(url)
 
-            except Exception as e:
-                print(f"  ❌ Failed: {str(e)[:50]}")
-                self.failed.append({'url': url, 'error': str(e)})
+        if self.use_cache:
+            self._save_cache()
 
         print(f"\n✓ Crawled {len(crawled_urls)} pages")
         print(f"✓ Found {len(self.to_visit)} more URLs (not visited due to limits)")
@@ -179,21 +340,23 @@ def load_website_recursive(base_url: str, max_depth: int = 2, max_pages: int = 5
     print("LOADING INTO CHROMADB")
     print("="*80 + "\n")
 
-    rag = RAGSystem(persist_directory="outputs/chroma_db", collection_name="website_docs")
-
-    # Load each URL
-    successful = 0
-    failed = []
-
-    for i, url in enumerate(urls, 1):
-        try:
-            print(f"[{i}/{len(urls)}] Loading: {url}")
-            chunks = rag.load_website(url)
-            successful += 1
-            print(f"  ✓ Added {chunks} chunks")
-        except Exception as e:
-            print(f"  ❌ Failed: {str(e)[:50]}")
-            failed.append({'url': url, 'error': str(e)})
+    # Cache embeddings on disk by content hash, so re-running with different
+    # crawl settings only embeds pages (and chunks) that changed
+    rag = RAGSystem(
+        persist_directory="outputs/chroma_db",
+        collection_name="website_docs",
+        embeddings=OpenAIEmbeddings(cache=EmbeddingCache()),
+        # Pages share navigation and footer text; embed it only once
+        dedupe_near_duplicates=True
+    )
+
+    # Fetch all pages concurrently, then embed and store them in one batch
+    results = rag.load_websites(urls, max_workers=16)
+    successful = len(results['loaded_urls'])
+    failed = results['errors']
+    for item in failed:
+        print(f"  ❌ Failed: {item['url']}: {item['error'][:50]}")
+    print(f"  ✓ Added {results['added_chunks']} chunks")
 
     # Summary
     print("\n" + "="*80)
@@ -211,7 +374,7 @@ def load_website_recursive(base_url: str, max_depth: int = 2, max_pages: int = 5
     report_file = f"outputs/website_crawl_{timestamp}.txt"
     os.makedirs('outputs', exist_ok=True)
 
-    with open(report_file, 'w') as f:
+    with open(report_file, 'w', encoding='utf-8') as f:
         f.write("="*80 + "\n")
         f.write("WEBSITE SCRAPING REPORT - RECURSIVE METHOD\n")
         f.write("="*80 + "\n\n")
@@ -225,12 +388,10 @@ def load_website_recursive(base_url: str, max_depth: int = 2, max_pages: int = 5
         f.write(f"  - Pages not visited: {len(crawler.to_visit)}\n")
         f.write(f"  - Failed during crawl: {len(crawler.failed)}\n\n")
         f.write("URLs Loaded:\n")
-        for url in urls:
-            f.write(f"  - {url}\n")
+        f.write("".join(f"  - {url}\n" for url in urls))
         if failed:
             f.write("\nFailed to Load:\n")
-            for item in failed:
-                f.write(f"  - {item['url']}: {item['error']}\n")
+            f.write("".join(f"  - {item['url']}: {item['error']}\n" for item in failed))
         f.write("="*80 + "\n")
 
     print(f"\n✓ Report saved to: {report_file}")
@@ -10,26 +10,94 @@ Usage:
     uv run python examples/web_scraping_sitemap.py
 """
 
+import hashlib
+import json
 import os
 import sys
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Set
-import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterator, List, Set
+
+# lxml's libxml2 parser is several times faster than the pure-Python one
+# and has the same iterparse API
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from ragsystem import RAGSystem
+from embeddings import EmbeddingCache, OpenAIEmbeddings
+from loaders.web_loader import SESSION
 import requests
 
 
-def get_sitemap_urls(sitemap_url: str, max_urls: int = 100) -> List[str]:
+SITEMAP_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ragsystem", "sitemaps")
+
+
+@contextmanager
+def _open_sitemap(sitemap_url: str, use_cache: bool) -> Iterator[BinaryIO]:
+    """
+    Yield the sitemap XML as a binary stream.
+
+    Without the cache the response body is streamed directly. With it, the
+    body is written through to SITEMAP_CACHE_DIR together with its ETag and
+    Last-Modified headers; later runs send a conditional GET and read the
+    cached copy when the server answers 304 Not Modified.
+    """
+    if not use_cache:
+        with SESSION.get(sitemap_url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True  # transparently gunzip
+            yield response.raw
+        return
+
+    key = hashlib.sha256(sitemap_url.encode()).hexdigest()
+    path = os.path.join(SITEMAP_CACHE_DIR, f"{key}.xml")
+    meta_path = os.path.join(SITEMAP_CACHE_DIR, f"{key}.meta.json")
+
+    headers = {}
+    if os.path.exists(path) and os.path.exists(meta_path):
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    with SESSION.get(sitemap_url, timeout=10, stream=True, headers=headers) as response:
+        if response.status_code == 304:
+            print("   Sitemap unchanged, using cached copy")
+        else:
+            response.raise_for_status()
+            os.makedirs(SITEMAP_CACHE_DIR, exist_ok=True)
+            # Write to a temporary file first so an interrupted download
+            # never leaves a truncated cache entry
+            with open(path + ".tmp", 'wb') as f:
+                for chunk in response.iter_content(64 * 1024):
+                    f.write(chunk)
+            os.replace(path + ".tmp", path)
+            with open(meta_path, 'w') as f:
+                json.dump({
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                }, f)
+
+    with open(path, 'rb') as f:
+        yield f
+
+
+def get_sitemap_urls(sitemap_url: str, max_urls: int = 100, use_cache: bool = True) -> List[str]:
     """
     Extract URLs from a sitemap.xml file.
 
     Args:
         sitemap_url: URL to sitemap.xml (e.g., https://example.com/sitemap.xml)
         max_urls: Maximum number of URLs to extract
+        use_cache: Keep a copy of the sitemap on disk and revalidate it with
+            a conditional GET instead of downloading it again
 
     Returns:
         List of URLs from the sitemap
@@ -37,39 +105,44 @@ def get_sitemap_urls(sitemap_url: str, max_urls: int = 100) -> List[str]:
     print(f"📥 Fetching sitemap: {sitemap_url}")
 
     try:
-        response = requests.get(sitemap_url, timeout=10)
-        response.raise_for_status()
-
-        # Parse XML
-        root = ET.fromstring(response.content)
-
-        # Handle different sitemap formats
-        # Standard sitemap namespace
-        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
-
         urls = []
+        sitemap_locs = []  # <loc>s of a sitemap index (sitemap of sitemaps)
+
+        # Stream the XML and collect <loc> text as it is parsed, stopping as
+        # soon as max_urls is reached instead of building the whole tree.
+        with _open_sitemap(sitemap_url, use_cache) as stream:
+            events = ET.iterparse(stream, events=('start', 'end'))
+
+            # Take the namespace from the root element once (standard
+            # sitemaps use the sitemaps.org one, some have none) and compare
+            # full tag names from then on
+            _, root = next(events)
+            ns = root.tag[:root.tag.index('}') + 1] if root.tag.startswith('{') else ''
+            tag_loc = f'{ns}loc'
+            tag_sitemap = f'{ns}sitemap'
+
+            in_sitemap = False
+            for event, elem in events:
+                tag = elem.tag
+                if tag == tag_sitemap:
+                    in_sitemap = event == 'start'
+                elif event == 'end' and tag == tag_loc and elem.text:
+                    if in_sitemap:
+                        sitemap_locs.append(elem.text.strip())
+                        if len(sitemap_locs) >= 5:  # Limit to first 5 sitemaps
+                            break
+                    else:
+                        urls.append(elem.text.strip())
+                        if len(urls) >= max_urls:
+                            break
+
+                if event == 'end':
+                    elem.clear()
 
-        # Try to find <loc> tags (URL locations)
-        for loc in root.findall('.//ns:loc', namespace):
-            if loc.text:
-                urls.append(loc.text)
-                if len(urls) >= max_urls:
-                    break
-
-        # If no URLs found with namespace, try without
-        if not urls:
-            for loc in root.findall('.//loc'):
-                if loc.text:
-                    urls.append(loc.text)
-                    if len(urls) >= max_urls:
-                        break
-
-        # Check for sitemap index (sitemap of sitemaps)
-        sitemap_locs = root.findall('.//ns:sitemap/ns:loc', namespace)
         if sitemap_locs and not urls:
-            print(f"📑 Found sitemap index with {len(sitemap_locs)} sub-sitemaps")
-            for sitemap_loc in sitemap_locs[:5]:  # Limit to first 5 sitemaps
-                sub_urls = get_sitemap_urls(sitemap_loc.text, max_urls - len(urls))
+            print(f"📑 Found sitemap index, reading {len(sitemap_locs)} sub-sitemaps")
+            for sitemap_loc in sitemap_locs:
+                sub_urls = get_sitemap_urls(sitemap_loc, max_urls - len(urls), use_cache)
                 urls.extend(sub_urls)
                 if len(urls) >= max_urls:
                     break
@@ -107,22 +180,24 @@ def load_website_from_sitemap(sitemap_url: str, max_pages: int = 50):
     print(f"\n📊 Will load {len(urls)} pages\n")
 
     # Initialize RAG system
-    rag = RAGSystem(persist_directory="outputs/chroma_db", collection_name="website_docs")
-
-    # Track results
-    successful = 0
-    failed = []
-
-    # Load each URL
-    for i, url in enumerate(urls, 1):
-        try:
-            print(f"[{i}/{len(urls)}] Loading: {url}")
-            chunks = rag.load_website(url)
-            successful += 1
-            print(f"  ✓ Added {chunks} chunks")
-        except Exception as e:
-            print(f"  ❌ Failed: {str(e)[:50]}")
-            failed.append({'url': url, 'error': str(e)})
+    # Cache embeddings on disk by content hash, so re-running with different
+    # crawl settings only embeds pages (and chunks) that changed
+    rag = RAGSystem(
+        persist_directory="outputs/chroma_db",
+        collection_name="website_docs",
+        embeddings=OpenAIEmbeddings(cache=EmbeddingCache()),
+        # Pages share navigation and footer text; embed it only once
+        dedupe_near_duplicates=True
+    )
+
+    # Fetch pages concurrently and embed them in batches as they arrive, so
+    # embedding overlaps the fetches still in flight
+    results = rag.load_websites(urls, max_workers=16, pages_per_batch=25)
+    successful = len(results['loaded_urls'])
+    failed = results['errors']
+    for item in failed:
+        print(f"  ❌ Failed: {item['url']}: {item['error'][:50]}")
+    print(f"  ✓ Added {results['added_chunks']} chunks")
 
     # Summary
     print("\n" + "="*80)
@@ -145,7 +220,7 @@ def load_website_from_sitemap(sitemap_url: str, max_pages: int = 50):
     report_file = f"outputs/website_scrape_{timestamp}.txt"
     os.makedirs('outputs', exist_ok=True)
 
-    with open(report_file, 'w') as f:
+    with open(report_file, 'w', encoding='utf-8') as f:
         f.write("="*80 + "\n")
         f.write("WEBSITE SCRAPING REPORT - SITEMAP METHOD\n")
         f.write("="*80 + "\n\n")
@@ -154,12 +229,10 @@ def load_website_from_sitemap(sitemap_url: str, max_pages: int = 50):
         f.write(f"Pages loaded: {successful}/{len(urls)}\n")
         f.write(f"Total chunks: {stats['total_documents']}\n\n")
         f.write("URLs Loaded:\n")
-        for url in urls:
-            f.write(f"  - {url}\n")
+        f.write("".join(f"  - {url}\n" for url in urls))
         if failed:
             f.write("\nFailed URLs:\n")
-            for item in failed:
-                f.write(f"  - {item['url']}: {item['error']}\n")
+            f.write("".join(f"  - {item['url']}: {item['error']}\n" for item in failed))
         f.write("="*80 + "\n")
 
     print(f"\n✓ Report saved to: {report_file}")
@@ -12,13 +12,25 @@ License:
     See LICENSE file for details.
 """
 
+import _thread
+import hashlib
 import os
+import queue
+import socket
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 import gradio as gr
 from ragsystem import RAGSystem
 from ragsystem import GraphRAGSystem
+from ragsystem import get_client
+from embeddings import OpenAIEmbeddings
 from ragsystem.knowledge_graph import GraphVisualizer
+from loaders.web_loader import SESSION, WebLoader
 from datetime import datetime
-import requests
 import xml.etree.ElementTree as ET
 from typing import List
 import json
@@ -30,30 +42,121 @@ rag = None
 graph_rag = None
 current_collection = "rag_documents"
 use_graph_mode = False  # Toggle between regular RAG and Graph RAG
+_embeddings = None  # Created on first initialize_rag, see _shared_embeddings
+_warm = False  # Set once _warm_up has run, see initialize_rag
+
+# Silence the multiprocessing resource tracker's warnings about leaked
+# semaphores when the process exits
+warnings.filterwarnings("ignore", category=UserWarning, message=".*resource_tracker.*")
+
+# Held while data/ is being ingested, so overlapping clicks don't load
+# (and embed) the same files twice
+_ingest_lock = threading.Lock()
+
+# Shared by the URL and sitemap loaders; fetches through the pooled SESSION
+_web_loader = WebLoader(timeout=15)
+
+# Query results and graph visualizations are saved here
+os.makedirs('outputs', exist_ok=True)
+
+# Stats of the active collection (and their Markdown rendering), reused for
+# STATS_TTL seconds so UI refreshes and queries don't each query ChromaDB.
+# Reset by anything that switches collection or adds documents.
+STATS_TTL = 5.0
+_stats_cache = {"t": 0.0, "key": None, "stats": None, "markdown": None}
+
+# Finished (answer, sources) of recent questions, most recently used last, so
+# repeating a question (e.g. one of the examples) skips search and the LLM
+ANSWER_CACHE_SIZE = 128
+_answer_cache = OrderedDict()
+_answer_cache_lock = threading.Lock()
 
 
 def get_available_collections():
     """Get list of available collections in the database."""
     try:
-        from ragsystem.storage.chroma_storage import ChromaVectorStore
-        import chromadb
-        from chromadb.config import Settings
-
-        client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(anonymized_telemetry=False, allow_reset=False)
-        )
-        collections = client.list_collections()
+        collections = get_client(persist_directory).list_collections()
         return [coll.name for coll in collections]
     except Exception as e:
         print(f"Error getting collections: {e}")
         return []
 
 
+def _cached_stats(active_system):
+    """Return active_system.get_stats(), cached for STATS_TTL seconds."""
+    key = (use_graph_mode, current_collection)
+    if _stats_cache["key"] != key or time.monotonic() - _stats_cache["t"] >= STATS_TTL:
+        _stats_cache["stats"] = active_system.get_stats()
+        _stats_cache["markdown"] = None
+        _stats_cache["key"] = key
+        _stats_cache["t"] = time.monotonic()
+    return _stats_cache["stats"]
+
+
+@lru_cache(maxsize=256)
+def _cached_search(graph_mode, collection, query, top_k, in_memory=False):
+    """Search the active system, memoized per (mode, collection, query, top_k).
+
+    ``in_memory`` searches regular RAG's in-memory copy of the collection;
+    Graph RAG always searches ChromaDB.
+    """
+    if graph_mode:
+        return tuple(graph_rag.search(query, top_k=top_k))
+    return tuple(rag.search(query, top_k=top_k, in_memory=in_memory))
+
+
+def _invalidate_caches():
+    """Drop cached stats, search results and answers (after switching or loading)."""
+    _stats_cache["t"] = 0.0
+    _cached_search.cache_clear()
+    with _answer_cache_lock:
+        _answer_cache.clear()
+
+
+def _not_ready(message):
+    """Message for handlers called before a RAG system is available."""
+    if _startup.is_alive():
+        return "⏳ Initializing, please retry in a moment..."
+    return message
+
+
+def _shared_embeddings():
+    """Embedding provider shared by every system the app creates."""
+    global _embeddings
+    if _embeddings is None:
+        _embeddings = OpenAIEmbeddings()
+    return _embeddings
+
+
+def _warm_up(active_system):
+    """Embed one string and count the collection once.
+
+    The first user query then doesn't pay for creating the embedding client
+    and its connection or for opening the collection. Failures (e.g. no API
+    key yet) are only logged.
+    """
+    global _warm
+    start = time.perf_counter()
+    try:
+        active_system.embeddings.embed("warmup")
+        len(active_system.vector_store)
+    except Exception as e:
+        print(f"Warm-up skipped: {e}")
+        return
+    _warm = True
+    print(f"Warm-up done in {time.perf_counter() - start:.2f}s")
+
+
 def initialize_rag(collection_name="rag_documents", enable_graph=False):
-    """Initialize or reinitialize the RAG system."""
+    """Initialize or reinitialize the RAG system.
+
+    Switching collection or mode reuses the ChromaDB client of each database
+    directory and one embedding provider (with its query cache); only the
+    collection handle is new.
+    """
     global rag, graph_rag, current_collection, use_graph_mode
 
+    _invalidate_caches()
     try:
         use_graph_mode = enable_graph
 
@@ -61,16 +164,26 @@ def initialize_rag(collection_name="rag_documents", enable_graph=False):
             graph_rag = GraphRAGSystem(
                 persist_directory=graph_persist_directory,
                 collection_name=collection_name,
-                enable_graph_extraction=True
+                embeddings=_shared_embeddings(),
+                enable_graph_extraction=True,
+                client=get_client(graph_persist_directory)
             )
             current_collection = collection_name
+            if not _warm:
+                _warm_up(graph_rag)
             return f"✓ Connected to Graph RAG collection: {collection_name}"
         else:
             rag = RAGSystem(
                 persist_directory=persist_directory,
-                collection_name=collection_name
+                collection_name=collection_name,
+                embeddings=_shared_embeddings(),
+                client=get_client(persist_directory)
             )
+            # The in-memory search copy holds int8 rows (a quarter of float32)
+            rag.vector_store.quantize_mirror = True
             current_collection = collection_name
+            if not _warm:
+                _warm_up(rag)
             return f"✓ Connected to collection: {collection_name}"
     except Exception as e:
         return f"❌ Error initializing RAG: {str(e)}"
@@ -99,10 +212,12 @@ def get_stats():
     active_system = graph_rag if use_graph_mode else rag
 
     if active_system is None:
-        return "❌ RAG system not initialized"
+        return _not_ready("❌ RAG system not initialized")
 
     try:
-        stats = active_system.get_stats()
+        stats = _cached_stats(active_system)
+        if _stats_cache["markdown"] is not None:
+            return _stats_cache["markdown"]
 
         info = f"""
 📊 **Database Statistics**
@@ -127,150 +242,251 @@ def get_stats():
 - Graph Extraction: {'✓ Enabled' if stats.get('graph_enabled') else '✗ Disabled'}
 """
             if stats.get('top_entities'):
-                info += "\n**Top Entities:**\n"
-                for entity, count in stats['top_entities'][:5]:
-                    info += f"  • {entity}: {count}\n"
+                info += "\n**Top Entities:**\n" + "".join(
+                    f"  • {entity}: {count}\n" for entity, count in stats['top_entities'][:5]
+                )
 
         info += f"\n**Storage Location:** {graph_persist_directory if use_graph_mode else persist_directory}"
 
+        _stats_cache["markdown"] = info
         return info
     except Exception as e:
         return f"❌ Error getting stats: {str(e)}"
 
 
+def get_counts_fast():
+    """Get the document count of the current collection only.
+
+    A single ChromaDB count(), without the configuration and knowledge graph
+    details of get_stats().
+    """
+    active_system = graph_rag if use_graph_mode else rag
+
+    if active_system is None:
+        return _not_ready("❌ RAG system not initialized")
+
+    try:
+        return (
+            f"📊 **Current Collection:** `{current_collection}`\n\n"
+            f"**Total Documents:** {len(active_system.vector_store)} chunks"
+        )
+    except Exception as e:
+        return f"❌ Error getting stats: {str(e)}"
+
+
 def query_documents(question, top_k=5, max_tokens=500, use_graph_context=False, save_output=False):
-    """Query the RAG system with optional graph context."""
+    """Query the RAG system with optional graph context.
+
+    A generator: yields (answer so far, sources) as the answer streams in,
+    with the sources shown before the first token.
+    """
     active_system = graph_rag if use_graph_mode else rag
 
     if active_system is None:
-        return "❌ RAG system not initialized. Please click 'Initialize System' first.", ""
+        yield _not_ready("❌ RAG system not initialized. Please click 'Initialize System' first."), ""
+        return
 
     if not question or not question.strip():
-        return "⚠️ Please enter a question.", ""
+        yield "⚠️ Please enter a question.", ""
+        return
 
     try:
         # Get statistics
-        stats = active_system.get_stats()
+        stats = _cached_stats(active_system)
 
         if stats['total_documents'] == 0:
-            return "❌ No documents in database. Please load documents first.", ""
-
-        # Query the system
+            yield "❌ No documents in database. Please load documents first.", ""
+            return
+
+        # A repeated question is answered from the cache, unless the result
+        # is to be saved to a new file
+        cache_key = (use_graph_mode, current_collection, question, int(top_k),
+                     int(max_tokens), bool(use_graph_context))
+        if not save_output:
+            with _answer_cache_lock:
+                cached = _answer_cache.get(cache_key)
+                if cached is not None:
+                    _answer_cache.move_to_end(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        # Search once; the results are both the LLM context and the sources
+        # shown, and the answer is streamed as it is generated
+        search_results = list(_cached_search(use_graph_mode, current_collection, question, int(top_k)))
         if use_graph_mode and use_graph_context:
-            answer = graph_rag.query(
+            _, answer_stream = graph_rag.query_stream(
                 question,
-                top_k=int(top_k),
                 max_tokens=int(max_tokens),
-                use_graph_context=True
+                use_graph_context=True,
+                results=search_results
             )
         else:
-            answer = active_system.query(question, top_k=int(top_k), max_tokens=int(max_tokens))
-
-        # Get source documents
-        search_results = active_system.search(question, top_k=int(top_k))
+            _, answer_stream = active_system.query_stream(
+                question,
+                max_tokens=int(max_tokens),
+                results=search_results
+            )
 
-        # Format sources
-        sources_text = "\n\n**📚 Sources Used:**\n\n"
-        for i, result in enumerate(search_results, 1):
-            sources_text += f"**{i}. {result['source']}** (Score: {result['score']:.3f})\n"
-            sources_text += f"   _{result['content'][:200]}..._\n"
+        # Format sources (collected in a list and joined once). Previews are
+        # sliced once per result; the saved file uses the full content.
+        previews = [result['content'][:200] for result in search_results]
+        parts = ["\n\n**📚 Sources Used:**\n\n"]
+        for i, (result, preview) in enumerate(zip(search_results, previews), 1):
+            parts.append(f"**{i}. {result['source']}** (Score: {result['score']:.3f})\n")
+            parts.append(f"   _{preview}..._\n")
 
             # Add graph info if available
             if use_graph_mode and 'graph' in result:
                 entities = result['graph'].get('entities', [])
                 if entities:
-                    sources_text += f"   *Entities: {', '.join(entities[:3])}*\n"
-            sources_text += "\n"
+                    parts.append(f"   *Entities: {', '.join(entities[:3])}*\n")
+            parts.append("\n")
+        sources_text = "".join(parts)
+
+        yield "", sources_text
+
+        answer = ""
+        for piece in answer_stream:
+            answer += piece
+            yield answer, sources_text
+
+        with _answer_cache_lock:
+            _answer_cache[cache_key] = (answer, sources_text)
+            _answer_cache.move_to_end(cache_key)
+            if len(_answer_cache) > ANSWER_CACHE_SIZE:
+                _answer_cache.popitem(last=False)
 
         # Save to file if requested
         output_file = ""
         if save_output:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = f"outputs/query_{timestamp}.txt"
-            os.makedirs('outputs', exist_ok=True)
-
-            with open(output_file, 'w') as f:
-                f.write("="*80 + "\n")
-                f.write(f"{'GRAPH ' if use_graph_mode else ''}RAG QUERY RESULT\n")
-                f.write("="*80 + "\n\n")
-                f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-                f.write(f"Question: {question}\n")
-                f.write(f"Top-K: {top_k}\n")
-                f.write(f"Graph Context: {use_graph_context}\n")
-                f.write(f"Max Tokens: {max_tokens}\n\n")
-                f.write("ANSWER:\n")
-                f.write(answer + "\n\n")
-                f.write("SOURCES:\n")
-                for i, result in enumerate(search_results, 1):
-                    f.write(f"{i}. {result['source']} (Score: {result['score']:.3f})\n")
-                    f.write(f"   {result['content']}\n\n")
-                f.write("="*80 + "\n")
+
+            # Assemble the report and write it in one call
+            parts = [
+                "="*80 + "\n",
+                f"{'GRAPH ' if use_graph_mode else ''}RAG QUERY RESULT\n",
+                "="*80 + "\n\n",
+                f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n",
+                f"Question: {question}\n",
+                f"Top-K: {top_k}\n",
+                f"Graph Context: {use_graph_context}\n",
+                f"Max Tokens: {max_tokens}\n\n",
+                "ANSWER:\n",
+                answer + "\n\n",
+                "SOURCES:\n",
+            ]
+            parts.extend(
+                f"{i}. {result['source']} (Score: {result['score']:.3f})\n   {result['content']}\n\n"
+                for i, result in enumerate(search_results, 1)
+            )
+            parts.append("="*80 + "\n")
+
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write("".join(parts))
 
             output_file = f"\n\n💾 Saved to: {output_file}"
 
-        return answer + output_file, sources_text
+        if output_file:
+            yield answer + output_file, sources_text
 
     except Exception as e:
-        return f"❌ Error during query: {str(e)}", ""
+        yield f"❌ Error during query: {str(e)}", ""
 
 
-def search_only(query, top_k=10):
+def search_only(query, top_k=10, in_memory=False):
     """Search documents without LLM generation."""
     active_system = graph_rag if use_graph_mode else rag
 
     if active_system is None:
-        return "❌ RAG system not initialized."
+        return _not_ready("❌ RAG system not initialized.")
 
     if not query or not query.strip():
         return "⚠️ Please enter a search query."
 
     try:
-        results = active_system.search(query, top_k=int(top_k))
+        results = _cached_search(use_graph_mode, current_collection, query, int(top_k), bool(in_memory))
 
         if not results:
             return "No results found."
 
-        output = f"**🔍 Search Results for:** _{query}_\n\n"
-        output += f"**Found {len(results)} results:**\n\n"
+        parts = [
+            f"**🔍 Search Results for:** _{query}_\n\n",
+            f"**Found {len(results)} results:**\n\n",
+        ]
 
         for i, result in enumerate(results, 1):
-            output += f"### {i}. {result['source']}\n"
-            output += f"**Similarity Score:** {result['score']:.3f}\n"
+            parts.append(f"### {i}. {result['source']}\n")
+            parts.append(f"**Similarity Score:** {result['score']:.3f}\n")
 
             # Add graph info if available
             if use_graph_mode and 'graph' in result:
                 entities = result['graph'].get('entities', [])
                 relations = result['graph'].get('relations', [])
                 if entities:
-                    output += f"**Entities:** {', '.join(entities)}\n"
+                    parts.append(f"**Entities:** {', '.join(entities)}\n")
                 if relations:
-                    output += f"**Relations:** {len(relations)} found\n"
+                    parts.append(f"**Relations:** {len(relations)} found\n")
 
-            output += f"**Content:**\n{result['content']}\n\n"
-            output += "---\n\n"
+            parts.append(f"**Content:**\n{result['content']}\n\n")
+            parts.append("---\n\n")
 
-        return output
+        return "".join(parts)
 
     except Exception as e:
         return f"❌ Error during search: {str(e)}"
 
 
 def load_sample_data():
-    """Load sample data from data/ directory."""
+    """Load sample data from data/ directory, yielding progress updates."""
     active_system = graph_rag if use_graph_mode else rag
 
     if active_system is None:
-        return "❌ RAG system not initialized."
+        yield _not_ready("❌ RAG system not initialized.")
+        return
+
+    if not os.path.exists('data/'):
+        yield "❌ No data/ directory found. Please create it and add some documents."
+        return
+
+    if not _ingest_lock.acquire(blocking=False):
+        yield "⚠️ Ingestion already in progress, please wait for it to finish."
+        return
+
+    # Load in a worker thread and relay its progress callbacks from here. The worker
+    # owns the lock so closing this generator mid-load can't let a second load start.
+    updates = queue.Queue()
+    outcome = {}
+
+    def run():
+        try:
+            outcome['chunks'] = active_system.load_file(
+                'data/', verbose=False, progress=lambda done, total: updates.put((done, total))
+            )
+        except Exception as e:
+            outcome['error'] = e
+        finally:
+            _ingest_lock.release()
+            updates.put(None)
 
     try:
-        if not os.path.exists('data/'):
-            return "❌ No data/ directory found. Please create it and add some documents."
+        threading.Thread(target=run, daemon=True).start()
+    except Exception as e:
+        _ingest_lock.release()
+        yield f"❌ Error loading data: {str(e)}"
+        return
 
-        chunks_added = active_system.load_file('data/', verbose=False)
+    try:
+        file_count = 0
+        while (update := updates.get()) is not None:
+            done, file_count = update
+            yield f"⏳ Processed {done}/{file_count} files..."
 
-        # Count files in data directory
-        file_count = sum(1 for root, _, files in os.walk('data/')
-                        for f in files if not f.startswith('.'))
+        if 'error' in outcome:
+            raise outcome['error']
+        chunks_added = outcome['chunks']
+        _invalidate_caches()
 
         result = f"""
 ✅ **Loading Complete!**
@@ -282,10 +498,10 @@ def load_sample_data():
 
 *Note: Files already in the database may be skipped to avoid duplicates.*
 """
-        return result
+        yield result
 
     except Exception as e:
-        return f"❌ Error loading data: {str(e)}"
+        yield f"❌ Error loading data: {str(e)}"
 
 
 def load_single_url(url: str) -> str:
@@ -293,7 +509,7 @@ def load_single_url(url: str) -> str:
     active_system = graph_rag if use_graph_mode else rag
 
     if active_system is None:
-        return "❌ RAG system not initialized."
+        return _not_ready("❌ RAG system not initialized.")
 
     if not url or not url.strip():
         return "❌ Please enter a URL."
@@ -303,14 +519,14 @@ def load_single_url(url: str) -> str:
         url = 'https://' + url
 
     try:
-        from loaders import WebLoader
-        loader = WebLoader(timeout=15)
+        loader = _web_loader
 
         print(f"Loading: {url}")
         docs = loader.load(url)
 
         # Process and add to RAG
         chunks_added = active_system._process_documents(docs)
+        _invalidate_caches()
 
         return f"""
 ✅ **Page Loaded Successfully!**
@@ -327,41 +543,66 @@ def load_single_url(url: str) -> str:
         return f"❌ Error loading URL: {str(e)}"
 
 
-def get_sitemap_urls(sitemap_url: str, max_urls: int = 50) -> List[str]:
-    """Extract URLs from sitemap.xml"""
-    try:
-        response = requests.get(sitemap_url, timeout=10)
-        response.raise_for_status()
+# Sitemap pages are embedded and stored in batches of this many documents
+SITEMAP_BATCH_DOCS = 256
 
-        root = ET.fromstring(response.content)
-        namespace = {'ns': 'http://www.sitemaps.org/schemas/sitemap/0.9'}
+# Parsed sitemap URL lists are reused from here for SITEMAP_CACHE_TTL seconds
+SITEMAP_CACHE_DIR = os.path.join('outputs', 'sitemap_cache')
+SITEMAP_CACHE_TTL = 3600
 
-        urls = []
-        for loc in root.findall('.//ns:loc', namespace):
-            if loc.text:
-                urls.append(loc.text)
-                if len(urls) >= max_urls:
-                    break
 
-        # Try without namespace if none found
-        if not urls:
-            for loc in root.findall('.//loc'):
-                if loc.text:
-                    urls.append(loc.text)
+def get_sitemap_urls(sitemap_url: str, max_urls: int = 50) -> List[str]:
+    """Extract URLs from sitemap.xml
+
+    The parsed list is cached on disk, so retrying with a different page
+    count within SITEMAP_CACHE_TTL doesn't fetch and parse the sitemap again.
+    """
+    cache_file = os.path.join(SITEMAP_CACHE_DIR, f"{hashlib.sha256(sitemap_url.encode()).hexdigest()}.json")
+    try:
+        if time.time() - os.path.getmtime(cache_file) < SITEMAP_CACHE_TTL:
+            with open(cache_file, encoding='utf-8') as f:
+                cached = json.load(f)
+            # A list cut short at a smaller max_urls can't serve a larger one
+            if cached['complete'] or len(cached['urls']) >= max_urls:
+                return cached['urls'][:max_urls]
+    except (OSError, ValueError, KeyError):
+        pass
+
+    try:
+        # Stream the XML and stop parsing once max_urls <loc>s are found,
+        # instead of building the whole tree
+        with SESSION.get(sitemap_url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            response.raw.decode_content = True  # transparently gunzip
+
+            urls = []
+            complete = True
+            for _, elem in ET.iterparse(response.raw, events=('end',)):
+                # Matches <loc> with or without the sitemaps.org namespace
+                if (elem.tag == 'loc' or elem.tag.endswith('}loc')) and elem.text:
+                    urls.append(elem.text.strip())
                     if len(urls) >= max_urls:
+                        complete = False
                         break
-
-        return urls[:max_urls]
+                elem.clear()
     except Exception as e:
         raise ValueError(f"Error parsing sitemap: {str(e)}")
 
+    # Write to a temporary file first so a reader never sees a partial entry
+    os.makedirs(SITEMAP_CACHE_DIR, exist_ok=True)
+    with open(cache_file + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump({'urls': urls, 'complete': complete}, f)
+    os.replace(cache_file + ".tmp", cache_file)
+
+    return urls
 
-def load_from_sitemap(sitemap_url: str, max_pages: int = 20) -> str:
+
+def load_from_sitemap(sitemap_url: str, max_pages: int = 20, max_workers: int = 8) -> str:
     """Load multiple pages from a sitemap."""
     active_system = graph_rag if use_graph_mode else rag
 
     if active_system is None:
-        return "❌ RAG system not initialized."
+        return _not_ready("❌ RAG system not initialized.")
 
     if not sitemap_url or not sitemap_url.strip():
         return "❌ Please enter a sitemap URL."
@@ -377,23 +618,36 @@ def load_from_sitemap(sitemap_url: str, max_pages: int = 20) -> str:
         if not urls:
             return f"❌ No URLs found in sitemap: {sitemap_url}"
 
-        from loaders import WebLoader
-        loader = WebLoader(timeout=15)
+        loader = _web_loader
 
         total_chunks = 0
         successful = 0
         failed = []
-
-        for i, url in enumerate(urls, 1):
-            try:
-                print(f"Loading {i}/{len(urls)}: {url}")
-                docs = loader.load(url)
-                chunks = active_system._process_documents(docs)
-                total_chunks += chunks
-                successful += 1
-            except Exception as e:
-                failed.append(f"{url}: {str(e)[:50]}")
-                print(f"  ✗ Failed: {e}")
+        pending_docs = []
+
+        # Fetch pages concurrently; their documents are batched and
+        # embedded/stored from this thread, so ChromaDB writes stay
+        # serialized and the embedder gets large batches
+        with ThreadPoolExecutor(max_workers=int(max_workers)) as pool:
+            futures = {pool.submit(loader.load, url): url for url in urls}
+            for i, future in enumerate(as_completed(futures), 1):
+                url = futures[future]
+                try:
+                    print(f"Loaded {i}/{len(urls)}: {url}")
+                    pending_docs.extend(future.result())
+                    successful += 1
+                except Exception as e:
+                    failed.append(f"{url}: {str(e)[:50]}")
+                    print(f"  ✗ Failed: {e}")
+
+                if len(pending_docs) >= SITEMAP_BATCH_DOCS:
+                    total_chunks += active_system._process_documents(pending_docs)
+                    pending_docs = []
+
+        if pending_docs:
+            total_chunks += active_system._process_documents(pending_docs)
+
+        _invalidate_caches()
 
         result = f"""
 ✅ **Sitemap Loading Complete!**
@@ -432,19 +686,20 @@ def get_all_entities():
         if not entities:
             return "No entities found. Please load documents first."
 
-        output = f"**🏷️ All Entities ({len(entities)} total):**\n\n"
+        parts = [f"**🏷️ All Entities ({len(entities)} total):**\n\n"]
 
         # Sort by frequency
         sorted_entities = sorted(entities.items(), key=lambda x: x[1], reverse=True)
 
-        for entity, count in sorted_entities[:50]:  # Show top 50
-            bar = "█" * min(count, 30)
-            output += f"`{entity}` {bar} ({count})\n"
+        parts.extend(
+            f"`{entity}` {'█' * min(count, 30)} ({count})\n"
+            for entity, count in sorted_entities[:50]  # Show top 50
+        )
 
         if len(entities) > 50:
-            output += f"\n*... and {len(entities) - 50} more entities*"
+            parts.append(f"\n*... and {len(entities) - 50} more entities*")
 
-        return output
+        return "".join(parts)
 
     except Exception as e:
         return f"❌ Error getting entities: {str(e)}"
@@ -464,27 +719,30 @@ def search_by_entity(entity_name, top_k=10):
         if not results:
             return f"No chunks found mentioning entity: {entity_name}"
 
-        output = f"**🎯 Chunks mentioning:** `{entity_name}`\n\n"
-        output += f"**Found {len(results)} chunks:**\n\n"
+        parts = [
+            f"**🎯 Chunks mentioning:** `{entity_name}`\n\n",
+            f"**Found {len(results)} chunks:**\n\n",
+        ]
+        entity_lower = entity_name.lower()
 
         for i, result in enumerate(results, 1):
-            output += f"### {i}. {result['source']}\n"
-            output += f"**Content:**\n{result['content'][:300]}...\n\n"
+            parts.append(f"### {i}. {result['source']}\n")
+            parts.append(f"**Content:**\n{result['content'][:300]}...\n\n")
 
             if 'graph' in result:
                 entities = result['graph'].get('entities', [])
                 relations = result['graph'].get('relations', [])
                 if entities:
-                    output += f"**Other Entities:** {', '.join([e for e in entities if e != entity_name][:5])}\n"
+                    parts.append(f"**Other Entities:** {', '.join([e for e in entities if e != entity_name][:5])}\n")
                 if relations:
                     # Find relations involving this entity
-                    relevant_rels = [r for r in relations if entity_name.lower() in r.lower()]
+                    relevant_rels = [r for r in relations if entity_lower in r.lower()]
                     if relevant_rels:
-                        output += f"**Relations:** {', '.join(relevant_rels[:3])}\n"
+                        parts.append(f"**Relations:** {', '.join(relevant_rels[:3])}\n")
 
-            output += "\n---\n\n"
+            parts.append("\n---\n\n")
 
-        return output
+        return "".join(parts)
 
     except Exception as e:
         return f"❌ Error searching by entity: {str(e)}"
@@ -504,26 +762,25 @@ def traverse_graph(start_entity, max_hops=2):
         if not subgraph['entities']:
             return f"No connections found for entity: {start_entity}"
 
-        output = f"**🕸️ Graph Traversal from:** `{start_entity}`\n\n"
-        output += f"**Max Hops:** {max_hops}\n"
-        output += f"**Connected Entities:** {len(subgraph['entities'])}\n\n"
-
-        output += "**Entities Found:**\n"
-        for entity in subgraph['entities'][:20]:
-            output += f"  • {entity}\n"
+        parts = [
+            f"**🕸️ Graph Traversal from:** `{start_entity}`\n\n",
+            f"**Max Hops:** {max_hops}\n",
+            f"**Connected Entities:** {len(subgraph['entities'])}\n\n",
+            "**Entities Found:**\n",
+        ]
+        parts.extend(f"  • {entity}\n" for entity in subgraph['entities'][:20])
 
         if len(subgraph['entities']) > 20:
-            output += f"  ... and {len(subgraph['entities']) - 20} more\n"
+            parts.append(f"  ... and {len(subgraph['entities']) - 20} more\n")
 
         if subgraph['relations']:
-            output += f"\n**Relationships ({len(subgraph['relations'])} total):**\n\n"
-            for s, r, t in subgraph['relations'][:15]:
-                output += f"  • `{s}` --[{r}]--> `{t}`\n"
+            parts.append(f"\n**Relationships ({len(subgraph['relations'])} total):**\n\n")
+            parts.extend(f"  • `{s}` --[{r}]--> `{t}`\n" for s, r, t in subgraph['relations'][:15])
 
             if len(subgraph['relations']) > 15:
-                output += f"\n  *... and {len(subgraph['relations']) - 15} more relationships*\n"
+                parts.append(f"\n  *... and {len(subgraph['relations']) - 15} more relationships*\n")
 
-        return output
+        return "".join(parts)
 
     except Exception as e:
         return f"❌ Error traversing graph: {str(e)}"
@@ -546,15 +803,15 @@ def visualize_graph():
 
         # Mermaid diagram
         entity_list = list(entities.keys())[:20]
+        entity_set = set(entity_list)
         filtered_relations = [
             (s, r, t) for s, r, t in relations
-            if s in entity_list and t in entity_list
+            if s in entity_set and t in entity_set
         ]
 
         mermaid = GraphVisualizer.to_mermaid(entity_list, filtered_relations)
 
         # Save HTML visualization
-        os.makedirs('outputs', exist_ok=True)
         GraphVisualizer.save_html_visualization(
             entity_list,
             filtered_relations,
@@ -571,39 +828,32 @@ def visualize_graph():
 
 def shutdown_server():
     """Shutdown the Gradio server gracefully."""
-    import sys
-    import threading
-    import os
-    import signal
-    import warnings
-
-    def stop():
-        print("\n" + "="*80)
-        print("🛑 SHUTDOWN REQUESTED")
-        print("="*80)
-        print("\n✓ Closing server...")
-        print("✓ Terminal will close automatically in 2 seconds...")
-        print("\n" + "="*80 + "\n")
+    print("\n" + "="*80)
+    print("🛑 SHUTDOWN REQUESTED")
+    print("="*80)
+    print("\n✓ Closing server...")
+    print("\n" + "="*80 + "\n")
 
-        # Give time for the message to display
-        import time
-        time.sleep(2)
+    return "✅ **Server shutting down...**\n\n**The terminal will close automatically.**\n\nYou can close this browser tab now."
 
-        # Suppress resource tracker warnings during shutdown
-        warnings.filterwarnings("ignore", category=UserWarning, message=".*resource_tracker.*")
 
-        # Use os._exit for immediate termination without cleanup
-        # This prevents resource tracker warnings about leaked semaphores
-        os._exit(0)
+def _close_app():
+    """Stop the server once the shutdown message has been delivered."""
+    def stop():
+        # Drain the queue and close the server, then make launch() return
+        # in the main thread so the interpreter exits normally (letting
+        # ChromaDB close its SQLite database instead of being killed)
+        app.close()
+        _thread.interrupt_main()
 
-    # Start shutdown in background thread
+    # Closing waits for open requests, including this one; don't block it
     threading.Thread(target=stop, daemon=True).start()
 
-    return "✅ **Server shutting down...**\n\n**The terminal will close automatically.**\n\nYou can close this browser tab now."
-
 
-# Initialize RAG on startup
-startup_message = initialize_rag()
+# Connect in the background so the interface starts serving immediately;
+# handlers report "Initializing" until the RAG system is ready
+_startup = threading.Thread(target=lambda: print(initialize_rag()), daemon=True)
+_startup.start()
 
 # Create Gradio interface
 with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.Soft()) as app:
@@ -627,10 +877,14 @@ with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.S
 
     mode_status = gr.Markdown()
 
+    # Switching replaces the global RAG system, so it shares the loaders'
+    # single slot instead of running while documents are being added
     mode_toggle.change(
         fn=switch_mode,
         inputs=mode_toggle,
-        outputs=mode_status
+        outputs=mode_status,
+        concurrency_id="ingest",
+        concurrency_limit=1
     )
 
     with gr.Tabs():
@@ -676,8 +930,10 @@ with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.S
                     query_btn = gr.Button("🔍 Ask Question", variant="primary", size="lg")
 
                 with gr.Column(scale=1):
-                    stats_display = gr.Markdown(get_stats())
-                    refresh_stats_btn = gr.Button("🔄 Refresh Stats")
+                    stats_display = gr.Markdown("⏳ Loading...")
+                    with gr.Row():
+                        refresh_stats_btn = gr.Button("🔄 Refresh Count")
+                        full_stats_btn = gr.Button("📋 Full Stats")
 
             answer_output = gr.Markdown(label="Answer")
             sources_output = gr.Markdown(label="Sources")
@@ -685,14 +941,24 @@ with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.S
             query_btn.click(
                 fn=query_documents,
                 inputs=[question_input, top_k_slider, max_tokens_slider, use_graph_checkbox, save_checkbox],
-                outputs=[answer_output, sources_output]
+                outputs=[answer_output, sources_output],
+                concurrency_id="llm",
+                api_name="query"
             )
 
             refresh_stats_btn.click(
+                fn=get_counts_fast,
+                outputs=stats_display
+            )
+
+            full_stats_btn.click(
                 fn=get_stats,
                 outputs=stats_display
             )
 
+            # Fill in the stats panel when a page is opened
+            app.load(fn=get_stats, outputs=stats_display)
+
             # Example questions
             gr.Markdown("### 💡 Example Questions")
             gr.Examples(
@@ -723,13 +989,20 @@ with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.S
                 label="Number of results"
             )
 
+            search_in_memory = gr.Checkbox(
+                label="Use in-memory cache",
+                value=False,
+                info="Exact search over a copy of the collection held in memory (regular RAG only; loaded on first use)"
+            )
+
             search_btn = gr.Button("🔍 Search", variant="primary")
             search_output = gr.Markdown(label="Search Results")
 
             search_btn.click(
                 fn=search_only,
-                inputs=[search_input, search_top_k],
-                outputs=search_output
+                inputs=[search_input, search_top_k, search_in_memory],
+                outputs=search_output,
+                concurrency_id="llm"
             )
 
         # Tab 3: Data Management
@@ -761,7 +1034,9 @@ with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.S
                         switch_btn.click(
                             fn=switch_collection,
                             inputs=collection_input,
-                            outputs=collection_output
+                            outputs=collection_output,
+                            concurrency_id="ingest",
+                            concurrency_limit=1
                         )
 
                     with gr.Column():
@@ -799,7 +1074,9 @@ with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.S
 
                     load_btn.click(
                         fn=load_sample_data,
-                        outputs=load_output
+                        outputs=load_output,
+                        concurrency_id="ingest",
+                        concurrency_limit=1
                     )
 
                 with gr.Column():
@@ -842,7 +1119,9 @@ with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.S
                             url_btn.click(
                                 fn=load_single_url,
                                 inputs=url_input,
-                                outputs=url_output
+                                outputs=url_output,
+                                concurrency_id="ingest",
+                                concurrency_limit=1
                             )
 
                         with gr.Column():
@@ -883,13 +1162,22 @@ with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.S
                                 step=1,
                                 label="Maximum pages to load"
                             )
+                            sitemap_max_workers = gr.Slider(
+                                minimum=1,
+                                maximum=16,
+                                value=8,
+                                step=1,
+                                label="Pages fetched in parallel"
+                            )
                             sitemap_btn = gr.Button("📑 Load from Sitemap", variant="primary")
                             sitemap_output = gr.Markdown()
 
                             sitemap_btn.click(
                                 fn=load_from_sitemap,
-                                inputs=[sitemap_url_input, sitemap_max_pages],
-                                outputs=sitemap_output
+                                inputs=[sitemap_url_input, sitemap_max_pages, sitemap_max_workers],
+                                outputs=sitemap_output,
+                                concurrency_id="ingest",
+                                concurrency_limit=1
                             )
 
                         with gr.Column():
@@ -1123,45 +1411,56 @@ with gr.Blocks(title="RAG System - Knowledge Graph Interface", theme=gr.themes.S
             shutdown_btn.click(
                 fn=shutdown_server,
                 outputs=shutdown_output
-            )
+            ).then(fn=_close_app)
+
+
+def free_port(preferred=7860, retries=2):
+    """Return the preferred port if it is free, else one picked by the kernel.
+
+    The preferred port is retried ``retries`` times, 0.2s apart, so a server
+    that is still shutting down (e.g. after stop_gradio.sh) can release it.
+    Binding to port 0 always succeeds, so no range of ports is probed.
+    """
+    for attempt, port in enumerate([preferred] * (retries + 1) + [0]):
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+                # Like the server's own socket, accept a port whose previous
+                # connections are still in TIME_WAIT (e.g. right after a
+                # restart). Not on Windows, where it allows binding a port
+                # another process is listening on.
+                if os.name != 'nt':
+                    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                s.bind(("127.0.0.1", port))
+                return s.getsockname()[1]
+        except OSError:
+            if attempt < retries:
+                time.sleep(0.2)
+    raise OSError("No free port available")
+
+
+# Run up to GRADIO_CONCURRENCY (default 4) queries/searches at once (LLM
+# calls are I/O bound) while ingestion, which shares the "ingest" slot, runs
+# one job at a time. Configured here so every launcher gets the same queue.
+app.queue(default_concurrency_limit=int(os.environ.get("GRADIO_CONCURRENCY", "4")), max_size=64)
+
+# Worker threads for sync handlers (pass as launch(max_threads=...)); sized
+# from the host instead of Gradio's fixed default of 40
+MAX_THREADS = max(16, min(128, (os.cpu_count() or 4) * 4))
 
 # Launch the app
 if __name__ == "__main__":
     print("="*80)
     print("Starting RAG System Gradio Interface")
     print("="*80)
-    print(f"\n{startup_message}")
+    print("\nConnecting to the database in the background...")
     print(f"\nPersist Directory: {persist_directory}")
 
-    if rag:
-        stats = rag.get_stats()
-        print(f"Documents in database: {stats['total_documents']}")
-        print(f"Embedding model: {stats['embedding_model']}")
-        print(f"LLM model: {stats['llm_model']}")
-
     print("\n" + "="*80)
     print("🚀 Launching Gradio interface...")
     print("="*80 + "\n")
 
-    # Try to find an available port
-    import socket
-
-    def find_free_port(start_port=7860, max_attempts=10):
-        """Find an available port starting from start_port."""
-        for port in range(start_port, start_port + max_attempts):
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind(("0.0.0.0", port))
-                    return port
-            except OSError:
-                continue
-        return None
-
-    port = find_free_port()
-    if port is None:
-        print("❌ Could not find an available port. Please close other applications using ports 7860-7869.")
-        import sys
-        sys.exit(1)
+    # Use 7860 when free, otherwise any port the kernel assigns
+    port = free_port()
 
     print(f"📡 Starting server on port {port}")
     print(f"🌐 URL: http://localhost:{port}")
@@ -1173,6 +1472,7 @@ if __name__ == "__main__":
         app.launch(
             server_name="127.0.0.1",  # Use localhost instead of 0.0.0.0
             server_port=port,
+            max_threads=MAX_THREADS,
             share=False,
             show_error=True,
             inbrowser=True,  # Automatically open browser
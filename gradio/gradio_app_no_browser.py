@@ -13,10 +13,6 @@ License:
     See LICENSE file for details.
 """
 
-# Import the main app
-import sys
-import os
-
 # Modify the original launch to not open browser
 if __name__ == "__main__":
     print("="*80)
@@ -28,25 +24,11 @@ if __name__ == "__main__":
     # Import and modify the gradio_app module
     import gradio_app
 
-    # Get the original app
+    # Get the original app (its queue is already configured on import)
     app = gradio_app.app
 
-    # Find a free port
-    import socket
-    def find_free_port(start_port=7860, max_attempts=10):
-        for port in range(start_port, start_port + max_attempts):
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.bind(("127.0.0.1", port))
-                    return port
-            except OSError:
-                continue
-        return None
-
-    port = find_free_port()
-    if port is None:
-        print("❌ Could not find an available port. Run ./stop_gradio.sh first.")
-        sys.exit(1)
+    # Use 7860 when free, otherwise any port the kernel assigns
+    port = gradio_app.free_port()
 
     print("="*80)
     print(f"🚀 Server starting on port {port}")
@@ -61,6 +43,7 @@ if __name__ == "__main__":
     app.launch(
         server_name="127.0.0.1",
         server_port=port,
+        max_threads=gradio_app.MAX_THREADS,
         share=False,
         show_error=True,
         inbrowser=False,  # DO NOT auto-open browser
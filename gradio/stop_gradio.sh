@@ -23,8 +23,9 @@ for port in {7860..7869}; do
     fi
 done
 
-# Also check for any python processes running gradio_app.py
-gradio_pids=$(pgrep -f "gradio_app.py")
+# Also check for any python processes running a gradio_app*.py script
+# (the app falls back to an OS-assigned port when 7860 is busy)
+gradio_pids=$(pgrep -f "gradio_app[a-z_]*\.py")
 if [ ! -z "$gradio_pids" ]; then
     echo "Found Gradio app processes: $gradio_pids"
     for pid in $gradio_pids; do
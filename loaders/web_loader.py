@@ -3,21 +3,50 @@
 
 import requests
 from bs4 import BeautifulSoup
-from typing import List, Dict
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional
+from urllib3.util.retry import Retry
 from .base import BaseLoader
 
 
+def make_session(pool_size: int = 32) -> requests.Session:
+    """
+    Create a requests session with connection pooling and retries.
+
+    Keep-alive connections are reused across requests to the same host, and
+    429/5xx responses are retried with exponential backoff.
+
+    Args:
+        pool_size: Connections kept per host (match the number of threads)
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)),
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Shared by every WebLoader (and the scraping examples) unless one is passed in
+SESSION = make_session()
+
+
 class WebLoader(BaseLoader):
     """Load content from web pages."""
     
-    def __init__(self, timeout: int = 10):
+    def __init__(self, timeout: int = 10, session: Optional[requests.Session] = None):
         """
         Initialize web loader.
         
         Args:
             timeout: Request timeout in seconds
+            session: Session to fetch with (defaults to the shared SESSION)
         """
         self.timeout = timeout
+        self.session = session if session is not None else SESSION
     
     def load(self, url: str) -> List[Dict[str, str]]:
         """
@@ -30,7 +59,7 @@ class WebLoader(BaseLoader):
             List containing a single document dictionary
         """
         try:
-            response = requests.get(url, timeout=self.timeout)
+            response = self.session.get(url, timeout=self.timeout)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -11,7 +11,7 @@ try:
 except Exception:
 	pass
 
-__all__ = ["RAGSystem", "GraphRAGSystem"]
+__all__ = ["RAGSystem", "GraphRAGSystem", "get_client"]
 
 def __getattr__(name: str):
 	if name == "RAGSystem":
@@ -24,6 +24,11 @@ def __getattr__(name: str):
 
 		mod = importlib.import_module("ragsystem.graph_rag")
 		return getattr(mod, "GraphRAGSystem")
+	elif name == "get_client":
+		import importlib
+
+		mod = importlib.import_module("ragsystem.storage.chroma_storage")
+		return getattr(mod, "get_client")
 	raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
@@ -1,42 +1,122 @@
 """Text chunking with overlap."""
 
-from typing import List
+import re
+from bisect import bisect_left
+from functools import lru_cache
+from typing import List, Optional, Tuple
 
 
 class TextChunker:
     """Split text into overlapping chunks."""
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+    _BOUNDARY_RE = re.compile(r'[.\n?!]')
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        use_text_splitter: bool = False,
+        tokenizer: Optional[str] = None,
+    ):
+        """
+        Initialize text chunker.
+
+        Args:
+            chunk_size: Maximum size of each chunk (characters, or tokens if
+                `tokenizer` is set)
+            chunk_overlap: Overlap between chunks, in the same unit as chunk_size
+            use_text_splitter: Use the Rust-backed `semantic-text-splitter`
+                package when it is installed (uv add semantic-text-splitter).
+                Falls back to the pure-Python splitter otherwise.
+            tokenizer: tiktoken encoding name (e.g. "cl100k_base"). When set,
+                chunks are sized in tokens so they line up with what embedding
+                APIs bill and truncate. Takes precedence over use_text_splitter.
+        """
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
 
+        self._encoding = None
+        if tokenizer is not None:
+            try:
+                import tiktoken
+            except ImportError:
+                raise ImportError(
+                    "tiktoken is required for token-based chunking. "
+                    "Install it with: uv add tiktoken"
+                )
+            self._encoding = tiktoken.get_encoding(tokenizer)
+
+        self._splitter = None
+        if use_text_splitter:
+            try:
+                from semantic_text_splitter import TextSplitter
+            except ImportError:
+                pass
+            else:
+                self._splitter = TextSplitter(chunk_size, overlap=chunk_overlap)
+
+        # Per-instance memo: chunk output depends on this chunker's settings
+        self._chunk_cached = lru_cache(maxsize=256)(self._chunk_uncached)
+
     def chunk(self, text: str) -> List[str]:
+        """Split ``text`` into chunks; repeated texts are served from a memo."""
         if not text or not text.strip():
             return []
+        return list(self._chunk_cached(text))
+
+    def _chunk_uncached(self, text: str) -> Tuple[str, ...]:
+        return tuple(self._split(text))
+
+    def _split(self, text: str) -> List[str]:
+        if self._encoding is not None:
+            return self._chunk_tokens(text)
+
+        if self._splitter is not None:
+            return [c for c in self._splitter.chunks(text) if len(c) > 50]
+
+        # Locate every sentence terminator in one pass over the text; each
+        # chunk then finds its break point with a binary search instead of
+        # rescanning its window.
+        boundaries = [m.start() for m in self._BOUNDARY_RE.finditer(text)]
 
         chunks = []
         start = 0
+        text_length = len(text)
 
-        while start < len(text):
+        # Work with offsets into the original string and slice only once per
+        # emitted window.
+        while start < text_length:
             end = start + self.chunk_size
-            chunk = text[start:end]
-
-            if end < len(text):
-                last_period = chunk.rfind('.')
-                last_newline = chunk.rfind('\n')
-                last_question = chunk.rfind('?')
-                last_exclamation = chunk.rfind('!')
 
-                break_point = max(last_period, last_newline, last_question, last_exclamation)
+            if end < text_length:
+                i = bisect_left(boundaries, end) - 1
+                if i >= 0 and boundaries[i] - start > self.chunk_size * 0.5:
+                    end = boundaries[i] + 1
 
-                if break_point > self.chunk_size * 0.5:
-                    chunk = chunk[:break_point + 1]
-                    end = start + break_point + 1
-
-            chunk = chunk.strip()
+            chunk = text[start:end].strip()
             if len(chunk) > 50:
                 chunks.append(chunk)
 
-            start = end - self.chunk_overlap
+            # The window reached the end of the text; anything after this
+            # would only repeat the overlap.
+            if end >= text_length:
+                break
+
+            # Always advance, even if chunk_overlap is not smaller than the window.
+            start = max(end - self.chunk_overlap, start + 1)
 
         return chunks
+
+    def _chunk_tokens(self, text: str) -> List[str]:
+        """Split by token windows: encode once, slice ids, decode per window."""
+        ids = self._encoding.encode(text)
+        step = max(self.chunk_size - self.chunk_overlap, 1)
+
+        windows = []
+        for start in range(0, len(ids), step):
+            windows.append(ids[start:start + self.chunk_size])
+            if start + self.chunk_size >= len(ids):
+                break
+
+        chunks = (window_text.strip() for window_text in self._encoding.decode_batch(windows))
+        return [chunk for chunk in chunks if len(chunk) > 50]
@@ -5,12 +5,27 @@ This avoids duplicating the implementation and ensures tests that import
 class used by `ragsystem`.
 """
 from embeddings.base_embeddings import BaseEmbeddings
-from embeddings.openai_embeddings import OpenAIEmbeddings
-from embeddings.sentence_transformer_embeddings import SentenceTransformerEmbeddings
-from embeddings.voyage_embeddings import VoyageEmbeddings
+from embeddings.embedding_cache import EmbeddingCache
+from embeddings.near_duplicates import NearDuplicateFilter
+
+# Providers are imported lazily so that importing the package does not pull in
+# openai, voyageai or sentence_transformers (torch) until one is used.
+def __getattr__(name):
+    if name == "OpenAIEmbeddings":
+        from embeddings.openai_embeddings import OpenAIEmbeddings
+        return OpenAIEmbeddings
+    elif name == "SentenceTransformerEmbeddings":
+        from embeddings.sentence_transformer_embeddings import SentenceTransformerEmbeddings
+        return SentenceTransformerEmbeddings
+    elif name == "VoyageEmbeddings":
+        from embeddings.voyage_embeddings import VoyageEmbeddings
+        return VoyageEmbeddings
+    raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
 
 __all__ = [
     "BaseEmbeddings",
+    "EmbeddingCache",
+    "NearDuplicateFilter",
     "OpenAIEmbeddings",
     "SentenceTransformerEmbeddings",
     "VoyageEmbeddings",
@@ -6,12 +6,15 @@ try:
 except ImportError:
     pass
 
+import heapq
 import openai
 import os
-from typing import List, Dict, Optional
+from operator import itemgetter
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from .chunkers import TextChunker
 from .embeddings import OpenAIEmbeddings
 from .knowledge_graph import KnowledgeGraphExtractor, GraphEnhancedStorage
+from .rag import NO_CONTEXT_ANSWER, walk_files
 
 
 class GraphRAGSystem:
@@ -32,7 +35,8 @@ class GraphRAGSystem:
         persist_directory: str = "./chroma_graph_db",
         collection_name: str = "graph_rag_documents",
         embeddings: Optional[object] = None,
-        enable_graph_extraction: bool = True
+        enable_graph_extraction: bool = True,
+        client: Optional[object] = None
     ):
         """
         Initialize Graph RAG system.
@@ -47,6 +51,7 @@ class GraphRAGSystem:
             collection_name: Name of ChromaDB collection
             embeddings: Custom embedding provider (works with ANY provider!)
             enable_graph_extraction: Whether to extract graph relationships
+            client: ChromaDB client to share between systems/collections
         """
         # Import loaders lazily
         from loaders import BaseLoader
@@ -81,7 +86,7 @@ class GraphRAGSystem:
             self.embeddings = OpenAIEmbeddings(api_key, embedding_model)
 
         # Graph-enhanced storage
-        self.vector_store = GraphEnhancedStorage(persist_directory, collection_name)
+        self.vector_store = GraphEnhancedStorage(persist_directory, collection_name, client=client)
 
         # Knowledge graph extractor
         self.enable_graph_extraction = enable_graph_extraction
@@ -100,7 +105,24 @@ class GraphRAGSystem:
             llm_api_key = self.embeddings.api_key
         self.client = openai.OpenAI(api_key=llm_api_key)
 
-    def _process_documents(self, documents: List[Dict]) -> int:
+    def add_documents_bulk(self, documents: List[Dict], batch_size: Optional[int] = None) -> int:
+        """
+        Chunk all documents up front and embed every chunk in one batched call.
+
+        Chunks are ordered by length before embedding so each mini-batch pads
+        to similar lengths.
+
+        Args:
+            documents: List of dicts with 'content', 'source' and 'type'
+            batch_size: Embedding batch size (provider default if None)
+
+        Returns:
+            Number of chunks added
+        """
+        return self._process_documents(documents, batch_size=batch_size, sort_by_length=True)
+
+    def _process_documents(self, documents: List[Dict], batch_size: Optional[int] = None,
+                           sort_by_length: bool = False) -> int:
         """Process documents with graph extraction."""
         chunks = []
 
@@ -108,6 +130,9 @@ class GraphRAGSystem:
             text_chunks = self.chunker.chunk(doc['content'])
 
             for chunk in text_chunks:
+                # Blank chunks have nothing to embed or retrieve
+                if not chunk.strip():
+                    continue
                 chunks.append({
                     'content': chunk,
                     'source': doc['source'],
@@ -120,9 +145,15 @@ class GraphRAGSystem:
 
         print(f"Created {len(chunks)} chunks, generating embeddings...")
 
+        if sort_by_length:
+            chunks.sort(key=lambda c: len(c['content']))
+
         # Generate embeddings (works with ANY embedding provider!)
         texts = [chunk['content'] for chunk in chunks]
-        chunk_embeddings = self.embeddings.embed_batch(texts)
+        if batch_size is not None:
+            chunk_embeddings = self.embeddings.embed_batch_np(texts, batch_size)
+        else:
+            chunk_embeddings = self.embeddings.embed_batch_np(texts)
 
         # Extract graph metadata if enabled
         graph_metadata = None
@@ -141,38 +172,56 @@ class GraphRAGSystem:
         print(f"Added {len(chunks)} chunks to graph-enhanced vector store")
         return len(chunks)
 
-    def load_file(self, filepath: str, verbose: bool = False):
-        """Load file with graph extraction."""
+    def load_file(self, filepath: str, verbose: bool = False,
+                  progress: Optional[Callable[[int, int], None]] = None):
+        """Load file with graph extraction.
+
+        Args:
+            progress: For a directory, called with (files loaded, total files)
+                as files are read; chunks are embedded after the last one
+        """
         # Reuse the same logic from RAGSystem
         import os
 
         if os.path.isdir(filepath):
-            total = 0
+            documents = []
+            processed = []
             skipped = []
             errors = []
 
-            for root, _, files in os.walk(filepath):
-                for fname in files:
-                    full = os.path.join(root, fname)
-                    try:
-                        added = self.load_file(full, verbose=False)
-                        if isinstance(added, dict):
-                            added = added.get('added_chunks', 0)
-                        total += added
-                    except ValueError:
-                        skipped.append(full)
-                    except Exception as e:
-                        errors.append({'file': full, 'error': str(e)})
+            # Load every file first, then chunk, embed and store them all in
+            # one pass so the collection sees a single batched add.
+            files = list(walk_files(filepath))
+            if progress is not None:
+                progress(0, len(files))
+            for done, (full, size) in enumerate(files, 1):
+                try:
+                    documents.extend(self._load_documents(full))
+                    processed.append((full, size))
+                except ValueError:
+                    skipped.append(full)
+                except Exception as e:
+                    errors.append({'file': full, 'error': str(e)})
+                if progress is not None:
+                    progress(done, len(files))
+
+            total = self._process_documents(documents) if documents else 0
 
             if verbose:
                 return {
                     'added_chunks': total,
+                    'processed_files': processed,
                     'skipped_files': skipped,
                     'errors': errors,
                 }
             return total
 
-        # Single file processing
+        return self._process_documents(self._load_documents(filepath))
+
+    def _load_documents(self, filepath: str) -> List[Dict]:
+        """Load a single file with the loader for its extension."""
+        import os
+
         ext = os.path.splitext(filepath)[1].lower()
 
         loaders = {
@@ -188,8 +237,7 @@ class GraphRAGSystem:
         loader = loaders.get(ext)
         if loader and hasattr(loader, 'load'):
             print(f"Loading {filepath}...")
-            docs = loader.load(filepath)
-            return self._process_documents(docs)
+            return loader.load(filepath)
         else:
             raise ValueError(f"Unsupported file type: {ext}")
 
@@ -198,6 +246,12 @@ class GraphRAGSystem:
         query_embedding = self.embeddings.embed(query)
         return self.vector_store.search(query_embedding, top_k)
 
+    def clear_query_cache(self):
+        """Drop the provider's in-memory cache of query embeddings."""
+        clear_cache = getattr(self.embeddings, 'clear_cache', None)
+        if clear_cache is not None:
+            clear_cache()
+
     def search_by_entity(self, entity: str, top_k: int = 10) -> List[Dict]:
         """Find chunks containing a specific entity."""
         return self.vector_store.find_by_entity(entity, top_k)
@@ -227,11 +281,53 @@ class GraphRAGSystem:
         Returns:
             Generated answer
         """
+        answer, _ = self.query_with_sources(question, top_k, use_graph_context, max_tokens)
+        return answer
+
+    def query_with_sources(self, question: str, top_k: int = 5, use_graph_context: bool = True,
+                           max_tokens: int = 500) -> Tuple[str, List[Dict]]:
+        """
+        Answer question like query(), also returning the retrieved chunks.
+
+        Returns:
+            (answer, search results)
+        """
         results = self.search(question, top_k)
 
         if not results:
-            return "I don't have any relevant information to answer this question."
+            return NO_CONTEXT_ANSWER, results
 
+        response = self.client.chat.completions.create(
+            model=self.llm_model,
+            messages=self._answer_messages(question, results, use_graph_context),
+            temperature=0.7,
+            max_tokens=max_tokens
+        )
+
+        return response.choices[0].message.content, results
+
+    def query_stream(self, question: str, top_k: int = 5, use_graph_context: bool = True,
+                     max_tokens: int = 500,
+                     results: Optional[List[Dict]] = None) -> Tuple[List[Dict], Iterator[str]]:
+        """
+        Search, then stream the answer as the LLM generates it.
+
+        Args:
+            results: Search results for ``question`` already at hand (skips
+                the search)
+
+        Returns:
+            (search results, iterator over pieces of the answer)
+        """
+        if results is None:
+            results = self.search(question, top_k)
+        if not results:
+            return results, iter([NO_CONTEXT_ANSWER])
+
+        messages = self._answer_messages(question, results, use_graph_context)
+        return results, self._stream_answer(messages, max_tokens)
+
+    def _answer_messages(self, question: str, results: List[Dict], use_graph_context: bool) -> List[Dict]:
         # Build context
         context_parts = []
         entities_mentioned = set()
@@ -260,26 +356,35 @@ class GraphRAGSystem:
                     graph_context += f"- {s} {r} {t}\n"
                 context += graph_context
 
-        response = self.client.chat.completions.create(
+        return [
+            {
+                "role": "system",
+                "content": "You are a helpful assistant with access to a knowledge graph. Answer questions based on the provided context and relationships. Cite sources when possible."
+            },
+            {
+                "role": "user",
+                "content": f"Context:\n{context}\n\nQuestion: {question}\n\nAnswer:"
+            }
+        ]
+
+    def _stream_answer(self, messages: List[Dict], max_tokens: int) -> Iterator[str]:
+        stream = self.client.chat.completions.create(
             model=self.llm_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant with access to a knowledge graph. Answer questions based on the provided context and relationships. Cite sources when possible."
-                },
-                {
-                    "role": "user",
-                    "content": f"Context:\n{context}\n\nQuestion: {question}\n\nAnswer:"
-                }
-            ],
+            messages=messages,
             temperature=0.7,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            stream=True
         )
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
-        return response.choices[0].message.content
+    def get_stats(self, top_k: int = 10) -> Dict:
+        """Get system statistics including graph info.
 
-    def get_stats(self) -> Dict:
-        """Get system statistics including graph info."""
+        Args:
+            top_k: Number of most frequent entities to include in 'top_entities'
+        """
         entities = self.get_entities()
         relations = self.get_relations()
 
@@ -293,5 +398,5 @@ class GraphRAGSystem:
             'graph_enabled': self.enable_graph_extraction,
             'total_entities': len(entities),
             'total_relations': len(relations),
-            'top_entities': sorted(entities.items(), key=lambda x: x[1], reverse=True)[:10]
+            'top_entities': heapq.nlargest(top_k, entities.items(), key=itemgetter(1))
         }
@@ -9,6 +9,20 @@ import os
 class KnowledgeGraphExtractor:
     """Extract entities and relationships from text to build knowledge graphs."""
 
+    # Patterns are compiled once here; pattern extraction runs for every chunk.
+    # Capitalized words (potential named entities)
+    _ENTITY_RE = re.compile(r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b')
+    # Simple relations (X is Y, X has Y, X uses Y, etc.)
+    _RELATION_PATTERNS = [
+        (re.compile(r'(\w+(?:\s+\w+)?)\s+is\s+(?:a|an)\s+(\w+(?:\s+\w+)?)', re.IGNORECASE), 'is_a'),
+        (re.compile(r'(\w+(?:\s+\w+)?)\s+has\s+(\w+(?:\s+\w+)?)', re.IGNORECASE), 'has'),
+        (re.compile(r'(\w+(?:\s+\w+)?)\s+uses\s+(\w+(?:\s+\w+)?)', re.IGNORECASE), 'uses'),
+        (re.compile(r'(\w+(?:\s+\w+)?)\s+contains\s+(\w+(?:\s+\w+)?)', re.IGNORECASE), 'contains'),
+        (re.compile(r'(\w+(?:\s+\w+)?)\s+requires\s+(\w+(?:\s+\w+)?)', re.IGNORECASE), 'requires'),
+    ]
+    _KEYWORD_RE = re.compile(r'\b[a-z]{3,}\b')
+    _STOP_WORDS = frozenset({'the', 'is', 'at', 'which', 'on', 'a', 'an', 'and', 'or', 'but', 'in', 'with', 'to', 'for', 'of', 'as', 'by', 'this', 'that', 'it', 'from', 'be', 'are', 'was', 'were'})
+
     def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini"):
         """
         Initialize knowledge graph extractor.
@@ -91,8 +105,7 @@ Return ONLY valid JSON, no markdown formatting."""
         entity_set: Set[str] = set()
 
         # Pattern: capitalized words (potential named entities)
-        capitalized_pattern = r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b'
-        matches = re.findall(capitalized_pattern, text)
+        matches = self._ENTITY_RE.findall(text)
 
         for match in matches:
             if match not in entity_set and len(match) > 2:
@@ -104,17 +117,8 @@ Return ONLY valid JSON, no markdown formatting."""
 
         # Extract simple relations (X is Y, X has Y, X uses Y, etc.)
         relations = []
-        relation_patterns = [
-            (r'(\w+(?:\s+\w+)?)\s+is\s+(?:a|an)\s+(\w+(?:\s+\w+)?)', 'is_a'),
-            (r'(\w+(?:\s+\w+)?)\s+has\s+(\w+(?:\s+\w+)?)', 'has'),
-            (r'(\w+(?:\s+\w+)?)\s+uses\s+(\w+(?:\s+\w+)?)', 'uses'),
-            (r'(\w+(?:\s+\w+)?)\s+contains\s+(\w+(?:\s+\w+)?)', 'contains'),
-            (r'(\w+(?:\s+\w+)?)\s+requires\s+(\w+(?:\s+\w+)?)', 'requires'),
-        ]
-
-        for pattern, relation_type in relation_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for source, target in matches:
+        for pattern, relation_type in self._RELATION_PATTERNS:
+            for source, target in pattern.findall(text):
                 relations.append((source.strip(), relation_type, target.strip()))
 
         return {
@@ -135,13 +139,11 @@ Return ONLY valid JSON, no markdown formatting."""
         """
         # Simple frequency-based extraction
         # Remove common stop words
-        stop_words = {'the', 'is', 'at', 'which', 'on', 'a', 'an', 'and', 'or', 'but', 'in', 'with', 'to', 'for', 'of', 'as', 'by', 'this', 'that', 'it', 'from', 'be', 'are', 'was', 'were'}
-
-        words = re.findall(r'\b[a-z]{3,}\b', text.lower())
+        words = self._KEYWORD_RE.findall(text.lower())
         word_freq = {}
 
         for word in words:
-            if word not in stop_words:
+            if word not in self._STOP_WORDS:
                 word_freq[word] = word_freq.get(word, 0) + 1
 
         # Sort by frequency
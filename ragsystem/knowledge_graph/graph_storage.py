@@ -1,11 +1,13 @@
 """Graph-enhanced storage layer for ChromaDB."""
 
-import chromadb
-from chromadb.config import Settings
 from typing import List, Dict, Optional, Set, Tuple
 import uuid
 import json
 
+import numpy as np
+
+from ..storage.chroma_storage import get_client
+
 
 class GraphEnhancedStorage:
     """
@@ -15,25 +17,21 @@ class GraphEnhancedStorage:
     while graph relationships are stored as metadata.
     """
 
-    def __init__(self, persist_directory: str = "./chroma_db", collection_name: str = "rag_graph"):
+    def __init__(self, persist_directory: str = "./chroma_db", collection_name: str = "rag_graph",
+                 client=None):
         """
         Initialize graph-enhanced storage.
 
         Args:
             persist_directory: Directory to persist ChromaDB data
             collection_name: Name of the collection to use
+            client: ChromaDB client to use (defaults to get_client(persist_directory))
         """
         self.persist_directory = persist_directory
         self.collection_name = collection_name
 
-        # Initialize ChromaDB client
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
+        # ChromaDB client, shared per directory
+        self.client = client if client is not None else get_client(persist_directory)
 
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
@@ -93,13 +91,21 @@ class GraphEnhancedStorage:
 
             metadatas.append(metadata)
 
-        # Add to ChromaDB
-        self.collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=contents,
-            metadatas=metadatas
-        )
+        # Hand ChromaDB one contiguous float32 matrix: lists of float64 are
+        # converted once here, and int8-quantized embeddings are widened (the
+        # collection uses cosine distance, so the int8 scale doesn't matter).
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        # Add to ChromaDB, splitting only where a call would exceed the
+        # client's maximum batch size
+        step = self.client.get_max_batch_size()
+        for i in range(0, len(ids), step):
+            self.collection.add(
+                ids=ids[i:i + step],
+                embeddings=embeddings[i:i + step],
+                documents=contents[i:i + step],
+                metadatas=metadatas[i:i + step]
+            )
 
     def search(self, query_embedding: List[float], top_k: int = 5, filter_dict: Optional[Dict] = None) -> List[Dict]:
         """
@@ -1,7 +1,9 @@
 """Visualization utilities for knowledge graphs."""
 
 from typing import List, Dict, Tuple, Optional
+import heapq
 import json
+from operator import itemgetter
 
 
 class GraphVisualizer:
@@ -118,7 +120,7 @@ class GraphVisualizer:
             ASCII art string
         """
         # Get top entities by frequency
-        top_entities = sorted(entities.items(), key=lambda x: x[1], reverse=True)[:max_entities]
+        top_entities = heapq.nlargest(max_entities, entities.items(), key=itemgetter(1))
 
         ascii_art = "Knowledge Graph Summary\n"
         ascii_art += "=" * 60 + "\n\n"
@@ -12,11 +12,32 @@ except ImportError:
 
 import openai
 import os
-from typing import List, Dict, Optional, Union
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterator, List, Dict, Optional, Tuple, Union
 from .chunkers import TextChunker
-from .embeddings import OpenAIEmbeddings
+from .embeddings import NearDuplicateFilter, OpenAIEmbeddings
 from .storage import ChromaVectorStore
 
+# Answer returned when the search finds nothing to base an answer on
+NO_CONTEXT_ANSWER = "I don't have any relevant information to answer this question."
+
+
+def walk_files(directory: str) -> Iterator[Tuple[str, int]]:
+    """Yield ``(path, size)`` for every file under ``directory``.
+
+    Uses ``os.scandir`` so sizes come from the directory-entry stat cache
+    rather than a separate ``os.path.getsize`` call per file.
+    """
+    with os.scandir(directory) as entries:
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.is_file():
+                yield entry.path, entry.stat().st_size
+    for subdir in subdirs:
+        yield from walk_files(subdir)
+
 
 class RAGSystem:
     """Retrieval-Augmented Generation system."""
@@ -29,7 +50,9 @@ class RAGSystem:
                  llm_model: str = "gpt-4o-mini",
                  persist_directory: str = "./chroma_db",
                  collection_name: str = "rag_documents",
-                 embeddings: Optional[object] = None):
+                 embeddings: Optional[object] = None,
+                 client: Optional[object] = None,
+                 dedupe_near_duplicates: bool = False):
         """
         Initialize RAG system.
 
@@ -43,6 +66,11 @@ class RAGSystem:
             collection_name: Name of ChromaDB collection
             embeddings: Custom embedding provider (BaseEmbeddings instance).
                        If None, uses OpenAI embeddings with embedding_model.
+            client: ChromaDB client to share between systems/collections.
+                    If None, the shared client for persist_directory is used.
+            dedupe_near_duplicates: Reuse the embedding of a near-duplicate chunk
+                    (same SimHash within 3 bits) instead of embedding it again.
+                    Saves embedding calls on crawls full of repeated boilerplate.
         """
         # Import loaders lazily; some loaders depend on optional packages
         # (requests, bs4, pypdf) which may not be available in test envs.
@@ -71,13 +99,19 @@ class RAGSystem:
 
         self.chunker = TextChunker(chunk_size, chunk_overlap)
 
+        # Chunks collected by load_file(use_batch_api=True) for one bulk job
+        self._pending_chunks = None
+
+        # Embeddings of chunks seen so far, reused for near duplicates
+        self._near_duplicates = NearDuplicateFilter() if dedupe_near_duplicates else None
+
         # Use provided embeddings or create default OpenAI embeddings
         if embeddings is not None:
             self.embeddings = embeddings
         else:
             self.embeddings = OpenAIEmbeddings(api_key, embedding_model)
 
-        self.vector_store = ChromaVectorStore(persist_directory, collection_name)
+        self.vector_store = ChromaVectorStore(persist_directory, collection_name, client=client)
         self.llm_model = llm_model
 
         # For OpenAI LLM, use the API key from embeddings if it's OpenAI, else use provided key
@@ -94,6 +128,60 @@ class RAGSystem:
         docs = self.web_loader.load(url)
         return self._process_documents(docs)
 
+    def load_websites(self, urls: List[str], max_workers: int = 8,
+                      pages_per_batch: Optional[int] = None) -> Dict:
+        """
+        Load many web pages, embedding and storing them in one pass.
+
+        Pages are fetched concurrently; the chunks of every page are then
+        embedded with one batched call and written with one bulk add.
+
+        Args:
+            urls: Page URLs to load
+            max_workers: Number of pages fetched concurrently
+            pages_per_batch: If set, embed and store pages in batches of this
+                size as soon as they arrive, while the remaining pages are
+                still being fetched. By default all pages form one batch.
+
+        Returns:
+            Summary dict with 'added_chunks', 'loaded_urls' and 'errors'
+            (a list of {'url', 'error'} dicts for pages that failed to load)
+        """
+        if not self.web_loader:
+            raise RuntimeError("WebLoader is not available (missing optional dependencies). Install `requests` and `beautifulsoup4` to enable this feature.")
+
+        documents = []
+        loaded = []
+        errors = []
+        added = 0
+        pages = 0
+
+        print(f"Loading {len(urls)} websites...")
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(self.web_loader.load, url): i for i, url in enumerate(urls)}
+            # Embedding runs on this thread, overlapping the fetches still
+            # in flight in the pool
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    documents.extend(future.result())
+                    loaded.append(i)
+                    pages += 1
+                except Exception as e:
+                    errors.append((i, {'url': urls[i], 'error': str(e)}))
+
+                if pages_per_batch and pages >= pages_per_batch:
+                    added += self._process_documents(documents) if documents else 0
+                    documents = []
+                    pages = 0
+
+        added += self._process_documents(documents) if documents else 0
+        return {
+            'added_chunks': added,
+            'loaded_urls': [urls[i] for i in sorted(loaded)],
+            'errors': [error for _, error in sorted(errors, key=lambda item: item[0])],
+        }
+
     def load_pdf(self, filepath: str) -> int:
         if not self.pdf_loader:
             raise RuntimeError("PDFLoader is not available (missing optional dependencies). Install `pypdf` to enable this feature.")
@@ -129,87 +217,118 @@ class RAGSystem:
         docs = self.md_loader.load(filepath)
         return self._process_documents(docs)
 
-    def load_file(self, filepath: str, verbose: bool = False):
+    def load_file(self, filepath: str, verbose: bool = False, use_batch_api: bool = False,
+                  progress: Optional[Callable[[int, int], None]] = None):
         """
         Auto-detect file type and load content.
 
         Args:
             filepath: Path to file
+            use_batch_api: Embed all chunks (for a directory: from every file)
+                in one OpenAI Batch API submission, at about half the cost.
+                Blocks until the job completes, which can take up to 24h.
+            progress: For a directory, called with (files done, total files)
+                after each file
 
         Returns:
             Number of chunks added
         """
+        if use_batch_api and self._pending_chunks is None:
+            if not hasattr(self.embeddings, 'embed_batch_async_job'):
+                raise ValueError("use_batch_api requires OpenAIEmbeddings")
+            self._pending_chunks = []
+            try:
+                added = self.load_file(filepath, verbose=verbose, progress=progress)
+                chunks = self._pending_chunks
+            finally:
+                self._pending_chunks = None
+            if chunks:
+                self._embed_and_store(chunks, use_batch_api=True)
+            return added
+
         if os.path.isdir(filepath):
             total = 0
+            processed = []
             skipped = []
             errors = []
 
-            for root, _, files in os.walk(filepath):
-                for fname in files:
-                    full = os.path.join(root, fname)
-                    try:
-                        if verbose:
-                            # Count chunks without invoking embeddings so tests
-                            # can run offline.
-                            ext = os.path.splitext(full)[1].lower()
-                            loader_map = {
-                                '.pdf': getattr(self, 'pdf_loader', None),
-                                '.docx': getattr(self, 'docx_loader', None),
-                                '.doc': getattr(self, 'docx_loader', None),
-                                '.csv': getattr(self, 'csv_loader', None),
-                                '.txt': getattr(self, 'txt_loader', None),
-                                '.md': getattr(self, 'md_loader', None),
-                                '.markdown': getattr(self, 'md_loader', None),
-                            }
-                            loader_inst = loader_map.get(ext)
-                            if loader_inst is None:
-                                # Fallback for simple text/markdown files: read
-                                # the file directly so verbose counting works
-                                # without optional loader deps.
-                                if ext in ('.txt',):
-                                    try:
-                                        with open(full, 'r', encoding='utf-8') as f:
-                                            text = f.read()
-                                    except Exception:
-                                        try:
-                                            with open(full, 'r', encoding='latin-1') as f:
-                                                text = f.read()
-                                        except Exception as e:
-                                            errors.append({'file': full, 'error': str(e)})
-                                            continue
-                                    total += len(self.chunker.chunk(text))
-                                    continue
-                                if ext in ('.md', '.markdown'):
+            files = list(walk_files(filepath))
+            for done, (full, size) in enumerate(files):
+                # Reported before each file (the body continues early in
+                # places) and once more after the last one
+                if progress is not None:
+                    progress(done, len(files))
+                try:
+                    if verbose:
+                        # Count chunks without invoking embeddings so tests
+                        # can run offline.
+                        ext = os.path.splitext(full)[1].lower()
+                        loader_map = {
+                            '.pdf': getattr(self, 'pdf_loader', None),
+                            '.docx': getattr(self, 'docx_loader', None),
+                            '.doc': getattr(self, 'docx_loader', None),
+                            '.csv': getattr(self, 'csv_loader', None),
+                            '.txt': getattr(self, 'txt_loader', None),
+                            '.md': getattr(self, 'md_loader', None),
+                            '.markdown': getattr(self, 'md_loader', None),
+                        }
+                        loader_inst = loader_map.get(ext)
+                        if loader_inst is None:
+                            # Fallback for simple text/markdown files: read
+                            # the file directly so verbose counting works
+                            # without optional loader deps.
+                            if ext in ('.txt',):
+                                try:
+                                    with open(full, 'r', encoding='utf-8') as f:
+                                        text = f.read()
+                                except Exception:
                                     try:
-                                        with open(full, 'r', encoding='utf-8') as f:
+                                        with open(full, 'r', encoding='latin-1') as f:
                                             text = f.read()
-                                        total += len(self.chunker.chunk(text))
-                                        continue
                                     except Exception as e:
                                         errors.append({'file': full, 'error': str(e)})
                                         continue
-
-                                skipped.append(full)
+                                total += len(self.chunker.chunk(text))
+                                processed.append((full, size))
                                 continue
+                            if ext in ('.md', '.markdown'):
+                                try:
+                                    with open(full, 'r', encoding='utf-8') as f:
+                                        text = f.read()
+                                    total += len(self.chunker.chunk(text))
+                                    processed.append((full, size))
+                                    continue
+                                except Exception as e:
+                                    errors.append({'file': full, 'error': str(e)})
+                                    continue
 
-                            docs = loader_inst.load(full)
-                            for doc in docs:
-                                total += len(self.chunker.chunk(doc['content']))
-                        else:
-                            # Non-verbose: delegate to file loader which will
-                            # generate embeddings and store them.
-                            added = self.load_file(full, verbose=False)
-                            if isinstance(added, dict):
-                                added = added.get('added_chunks', 0)
-                            total += added
-                    except ValueError:
-                        skipped.append(full)
-                    except Exception as e:
-                        errors.append({'file': full, 'error': str(e)})
+                            skipped.append(full)
+                            continue
+
+                        docs = loader_inst.load(full)
+                        for doc in docs:
+                            total += len(self.chunker.chunk(doc['content']))
+                        processed.append((full, size))
+                    else:
+                        # Non-verbose: delegate to file loader which will
+                        # generate embeddings and store them.
+                        added = self.load_file(full, verbose=False)
+                        if isinstance(added, dict):
+                            added = added.get('added_chunks', 0)
+                        total += added
+                        processed.append((full, size))
+                except ValueError:
+                    skipped.append(full)
+                except Exception as e:
+                    errors.append({'file': full, 'error': str(e)})
+
+            if progress is not None and files:
+                progress(len(files), len(files))
 
             if verbose:
                 return {
                     'added_chunks': total,
+                    'processed_files': processed,
                     'skipped_files': skipped,
                     'errors': errors,
                 }
@@ -246,6 +365,9 @@ class RAGSystem:
             text_chunks = self.chunker.chunk(doc['content'])
 
             for chunk in text_chunks:
+                # Blank chunks have nothing to embed or retrieve
+                if not chunk.strip():
+                    continue
                 chunks.append({
                     'content': chunk,
                     'source': doc['source'],
@@ -256,48 +378,126 @@ class RAGSystem:
             print("No chunks created")
             return 0
 
+        if self._pending_chunks is not None:
+            self._pending_chunks.extend(chunks)
+            return len(chunks)
+
+        self._embed_and_store(chunks)
+        return len(chunks)
+
+    def _embed_and_store(self, chunks: List[Dict], use_batch_api: bool = False):
         print(f"Created {len(chunks)} chunks, generating embeddings...")
 
         texts = [chunk['content'] for chunk in chunks]
-        chunk_embeddings = self.embeddings.embed_batch(texts)
+        if use_batch_api:
+            chunk_embeddings = self.embeddings.embed_batch_async_job(texts)
+        elif self._near_duplicates is not None:
+            chunk_embeddings = self._near_duplicates.embed_through(texts, self.embeddings.embed_batch_np)
+        else:
+            chunk_embeddings = self.embeddings.embed_batch_np(texts)
 
         self.vector_store.add_documents(chunks, chunk_embeddings)
 
         print(f"Added {len(chunks)} chunks to vector store")
-        return len(chunks)
 
-    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+    def search(self, query: str, top_k: int = 5, in_memory: bool = False) -> List[Dict]:
+        """
+        Return the ``top_k`` chunks most similar to ``query``.
+
+        With ``in_memory=True`` the search runs against an in-memory copy of
+        the collection (see ``ChromaVectorStore.search``) instead of ChromaDB.
+        """
         query_embedding = self.embeddings.embed(query)
-        return self.vector_store.search(query_embedding, top_k)
+        return self.vector_store.search(query_embedding, top_k, in_memory=in_memory)
+
+    def clear_query_cache(self):
+        """Drop the provider's in-memory cache of query embeddings.
+
+        Query embeddings come from ``embeddings.embed``, which the built-in
+        providers memoize per (model, text), so repeated questions skip the
+        embedding call.
+        """
+        clear_cache = getattr(self.embeddings, 'clear_cache', None)
+        if clear_cache is not None:
+            clear_cache()
 
     def query(self, question: str, top_k: int = 5, max_tokens: int = 500) -> str:
+        answer, _ = self.query_with_sources(question, top_k, max_tokens)
+        return answer
+
+    def query_with_sources(self, question: str, top_k: int = 5,
+                           max_tokens: int = 500) -> Tuple[str, List[Dict]]:
+        """
+        Answer a question and return the chunks the answer is based on.
+
+        The search runs once, so callers that show sources don't need a
+        second ``search`` (and its embedding and vector query).
+
+        Returns:
+            (answer, search results)
+        """
         results = self.search(question, top_k)
 
         if not results:
-            return "I don't have any relevant information to answer this question."
+            return NO_CONTEXT_ANSWER, results
 
+        response = self.client.chat.completions.create(
+            model=self.llm_model,
+            messages=self._answer_messages(question, results),
+            temperature=0.7,
+            max_tokens=max_tokens
+        )
+
+        return response.choices[0].message.content, results
+
+    def query_stream(self, question: str, top_k: int = 5, max_tokens: int = 500,
+                     results: Optional[List[Dict]] = None) -> Tuple[List[Dict], Iterator[str]]:
+        """
+        Search, then stream the answer as the LLM generates it.
+
+        Args:
+            results: Search results for ``question`` already at hand (skips
+                the search)
+
+        Returns:
+            (search results, iterator over pieces of the answer). The LLM
+            request starts when the iterator is first advanced, so the
+            sources can be shown before any token arrives.
+        """
+        if results is None:
+            results = self.search(question, top_k)
+        if not results:
+            return results, iter([NO_CONTEXT_ANSWER])
+        return results, self._stream_answer(self._answer_messages(question, results), max_tokens)
+
+    def _answer_messages(self, question: str, results: List[Dict]) -> List[Dict]:
         context = "\n\n".join([
             f"[Source: {r['source']}]\n{r['content']}"
             for r in results
         ])
 
-        response = self.client.chat.completions.create(
+        return [
+            {
+                "role": "system",
+                "content": "You are a helpful assistant. Answer questions based on the provided context. If the context doesn't contain relevant information, say so. Cite sources when possible."
+            },
+            {
+                "role": "user",
+                "content": f"Context:\n{context}\n\nQuestion: {question}\n\nAnswer:"
+            }
+        ]
+
+    def _stream_answer(self, messages: List[Dict], max_tokens: int) -> Iterator[str]:
+        stream = self.client.chat.completions.create(
             model=self.llm_model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant. Answer questions based on the provided context. If the context doesn't contain relevant information, say so. Cite sources when possible."
-                },
-                {
-                    "role": "user",
-                    "content": f"Context:\n{context}\n\nQuestion: {question}\n\nAnswer:"
-                }
-            ],
+            messages=messages,
             temperature=0.7,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            stream=True
         )
-
-        return response.choices[0].message.content
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
 
     def save(self, filepath: str):
         self.vector_store.save(filepath)
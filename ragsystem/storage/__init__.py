@@ -1,4 +1,4 @@
 from .vector_storage import VectorStore
-from .chroma_storage import ChromaVectorStore
+from .chroma_storage import ChromaVectorStore, get_client
 
-__all__ = ["VectorStore", "ChromaVectorStore"]
+__all__ = ["VectorStore", "ChromaVectorStore", "get_client"]
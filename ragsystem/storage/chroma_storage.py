@@ -2,32 +2,64 @@
 
 import chromadb
 from chromadb.config import Settings
+from functools import lru_cache
 from typing import List, Dict, Optional
+import os
+import threading
 import uuid
 
+import numpy as np
+
+from .vector_storage import VectorStore
+
+
+# Rows read per collection.get() call when building the in-memory mirror
+_MIRROR_PAGE_SIZE = 5000
+
+
+def get_client(persist_directory: str = "./chroma_db"):
+    """
+    Return the shared ChromaDB client for ``persist_directory``.
+
+    Stores and RAG systems pointing at the same directory reuse one client,
+    so the database is opened once no matter how many collections are used.
+    """
+    return _client_for_path(os.path.abspath(persist_directory))
+
+
+@lru_cache(maxsize=None)
+def _client_for_path(path: str):
+    return chromadb.PersistentClient(
+        path=path,
+        settings=Settings(
+            anonymized_telemetry=False,
+            allow_reset=True
+        )
+    )
+
 
 class ChromaVectorStore:
     """Vector store using ChromaDB for persistent storage."""
 
-    def __init__(self, persist_directory: str = "./chroma_db", collection_name: str = "rag_documents"):
+    def __init__(self, persist_directory: str = "./chroma_db", collection_name: str = "rag_documents",
+                 client=None, quantize_mirror: bool = False):
         """
         Initialize ChromaDB vector store.
 
         Args:
             persist_directory: Directory to persist ChromaDB data
             collection_name: Name of the collection to use
+            client: ChromaDB client to use (defaults to get_client(persist_directory))
+            quantize_mirror: Keep the in-memory copy used by search(in_memory=True)
+                as int8 rows, 4x smaller than float32; scores change only by
+                rounding error (about 0.01)
         """
         self.persist_directory = persist_directory
         self.collection_name = collection_name
+        self.quantize_mirror = quantize_mirror
 
-        # Initialize ChromaDB client with persistence
-        self.client = chromadb.PersistentClient(
-            path=persist_directory,
-            settings=Settings(
-                anonymized_telemetry=False,
-                allow_reset=True
-            )
-        )
+        # ChromaDB client with persistence, shared per directory
+        self.client = client if client is not None else get_client(persist_directory)
 
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
@@ -35,6 +67,11 @@ class ChromaVectorStore:
             metadata={"hnsw:space": "cosine"}  # Use cosine similarity
         )
 
+        # In-memory copy of the collection for search(in_memory=True), built
+        # on first use and kept in step by add_documents
+        self._mirror = None
+        self._mirror_lock = threading.Lock()
+
     def add_documents(self, documents: List[Dict], embeddings: List[List[float]]):
         """
         Add documents with their embeddings to the vector store.
@@ -64,25 +101,71 @@ class ChromaVectorStore:
             for doc in documents
         ]
 
-        # Add to ChromaDB
-        self.collection.add(
-            ids=ids,
-            embeddings=embeddings,
-            documents=contents,
-            metadatas=metadatas
-        )
+        # Hand ChromaDB one contiguous float32 matrix: lists of float64 are
+        # converted once here, and int8-quantized embeddings are widened (the
+        # collection uses cosine distance, so the int8 scale doesn't matter).
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        # Add to ChromaDB, splitting only where a call would exceed the
+        # client's maximum batch size
+        step = self.client.get_max_batch_size()
+        with self._mirror_lock:
+            for i in range(0, len(ids), step):
+                self.collection.add(
+                    ids=ids[i:i + step],
+                    embeddings=embeddings[i:i + step],
+                    documents=contents[i:i + step],
+                    metadatas=metadatas[i:i + step]
+                )
 
-    def search(self, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
+            if self._mirror is not None:
+                self._mirror.add_documents(
+                    [{'content': c, **m} for c, m in zip(contents, metadatas)], embeddings
+                )
+
+    def _build_mirror(self) -> VectorStore:
+        """Copy every row of the collection into an in-memory VectorStore."""
+        mirror = VectorStore(quantize=self.quantize_mirror)
+        total = self.collection.count()
+        for offset in range(0, total, _MIRROR_PAGE_SIZE):
+            page = self.collection.get(
+                limit=_MIRROR_PAGE_SIZE,
+                offset=offset,
+                include=['embeddings', 'documents', 'metadatas']
+            )
+            documents = [
+                {
+                    'content': content,
+                    'source': (metadata or {}).get('source', 'unknown'),
+                    'type': (metadata or {}).get('type', 'text')
+                }
+                for content, metadata in zip(page['documents'], page['metadatas'])
+            ]
+            mirror.add_documents(documents, page['embeddings'])
+        return mirror
+
+    def search(self, query_embedding: List[float], top_k: int = 5,
+               in_memory: bool = False) -> List[Dict]:
         """
         Search for similar documents using query embedding.
 
         Args:
             query_embedding: Query embedding vector
             top_k: Number of top results to return
+            in_memory: Search an in-memory copy of the collection with one
+                exact cosine mat-vec product instead of ChromaDB's HNSW index.
+                The copy is loaded on the first such search and updated by
+                add_documents; rows written by other processes are not seen.
 
         Returns:
             List of documents with similarity scores
         """
+        if in_memory:
+            with self._mirror_lock:
+                if self._mirror is None:
+                    self._mirror = self._build_mirror()
+                return self._mirror.search(query_embedding, top_k)
+
         # Check if collection is empty
         if self.collection.count() == 0:
             return []
@@ -130,6 +213,7 @@ class ChromaVectorStore:
         """
         # ChromaDB automatically loads from persist_directory
         # Reload the collection to ensure it's current
+        self._mirror = None
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name,
             metadata={"hnsw:space": "cosine"}
@@ -139,6 +223,7 @@ class ChromaVectorStore:
     def clear(self):
         """Clear all documents from the collection."""
         # Delete and recreate the collection
+        self._mirror = None
         self.client.delete_collection(name=self.collection_name)
         self.collection = self.client.get_or_create_collection(
             name=self.collection_name,
@@ -166,6 +251,7 @@ class ChromaVectorStore:
 
         # If we deleted the current collection, recreate it
         if name == self.collection_name:
+            self._mirror = None
             self.collection = self.client.get_or_create_collection(
                 name=self.collection_name,
                 metadata={"hnsw:space": "cosine"}
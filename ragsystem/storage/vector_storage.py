@@ -3,34 +3,138 @@
 import numpy as np
 import pickle
 from typing import List, Dict
-from sklearn.metrics.pairwise import cosine_similarity
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, np.finfo(np.float32).tiny)
+
+
+# Unit rows scaled by this constant fit int8 (see embeddings.quantize_int8)
+_INT8_SCALE = 127.0
+
+# Rows widened to float32 per step when scanning int8 rows, bounding the
+# temporary memory of a search
+_SCAN_BLOCK_ROWS = 65536
 
 
 class VectorStore:
-    def __init__(self):
+    def __init__(self, ann: bool = False, hnsw_m: int = 32, quantize: bool = False):
+        """
+        Initialize an in-memory vector store.
+
+        Args:
+            ann: Search with an approximate FAISS HNSW index instead of an exact
+                scan. Worth it from roughly 10k vectors; needs faiss
+                (uv add faiss-cpu) and falls back to the exact scan otherwise.
+            hnsw_m: Neighbours per node in the HNSW graph
+            quantize: Keep the normalized rows as int8 (4x less memory than
+                float32); scores change only by rounding error
+        """
         self.documents = []
-        self.embeddings = None
+        self.ann = ann
+        self.hnsw_m = hnsw_m
+        self.quantize = quantize
+        # FAISS index over the unit rows, built incrementally on add
+        self._index = None
+        # Embeddings are stored pre-normalized, so cosine search is a single
+        # mat-vec product: a contiguous float32 matrix of unit-norm rows plus
+        # each row's original length, kept to reconstruct the raw vectors.
+        # With quantize=True the rows are int8, scaled by _INT8_SCALE.
+        self._unit = None
+        self._magnitudes = None
+        # (unit rows, magnitudes) blocks added since the matrix was last
+        # stacked; stacking is deferred so repeated adds don't copy it each time
+        self._blocks = []
+
+    @property
+    def embeddings(self):
+        """All stored embeddings as one (N, D) float32 array, or None."""
+        self.rebuild_flat_index()
+        if self._unit is None:
+            return None
+        if self.quantize:
+            return self._unit * (self._magnitudes / _INT8_SCALE)[:, None]
+        return self._unit * self._magnitudes[:, None]
+
+    @embeddings.setter
+    def embeddings(self, value):
+        self._unit = None
+        self._magnitudes = None
+        self._blocks = []
+        self._index = None
+        if value is not None and len(value):
+            self._add_block(value)
+
+    def _add_block(self, embeddings):
+        block = np.asarray(embeddings, dtype=np.float32).reshape(len(embeddings), -1)
+        magnitudes = np.linalg.norm(block, axis=1)
+        unit = block / np.maximum(magnitudes, np.finfo(np.float32).tiny)[:, None]
+
+        if self.ann:
+            self._index_add(unit)
+
+        if self.quantize:
+            unit = np.clip(np.round(unit * _INT8_SCALE), -127, 127).astype(np.int8)
+        self._blocks.append((unit, magnitudes))
+
+    def _index_add(self, unit: np.ndarray):
+        if self._index is None:
+            try:
+                import faiss
+            except ImportError:
+                return
+            # Inner product over unit vectors is cosine similarity
+            self._index = faiss.IndexHNSWFlat(unit.shape[1], self.hnsw_m, faiss.METRIC_INNER_PRODUCT)
+            self._index.hnsw.efConstruction = 200
+        self._index.add(np.ascontiguousarray(unit))
 
     def add_documents(self, documents: List[Dict], embeddings: List[List[float]]):
         if len(documents) != len(embeddings):
             raise ValueError("Number of documents must match number of embeddings")
+        if not documents:
+            return
 
         self.documents.extend(documents)
-        new_embeddings = np.array(embeddings)
-        if self.embeddings is None:
-            self.embeddings = new_embeddings
-        else:
-            self.embeddings = np.vstack([self.embeddings, new_embeddings])
+        self._add_block(embeddings)
+
+    def rebuild_flat_index(self):
+        """Stack pending blocks into the normalized matrix used for search."""
+        if not self._blocks:
+            return
+        if self._unit is not None:
+            self._blocks.insert(0, (self._unit, self._magnitudes))
+        self._unit = np.ascontiguousarray(np.vstack([unit for unit, _ in self._blocks]))
+        self._magnitudes = np.concatenate([magnitudes for _, magnitudes in self._blocks])
+        self._blocks = []
 
     def search(self, query_embedding: List[float], top_k: int = 5) -> List[Dict]:
-        if self.embeddings is None or len(self.embeddings) == 0:
+        self.rebuild_flat_index()
+        if self._unit is None or len(self._unit) == 0:
             return []
 
-        query_embedding = np.array([query_embedding])
-        similarities = cosine_similarity(query_embedding, self.embeddings)[0]
+        query = _normalize_rows(np.asarray(query_embedding, dtype=np.float32))
+
+        if self._index is not None:
+            scores, indices = self._index.search(query.reshape(1, -1), min(top_k, len(self._unit)))
+            return [
+                {**self.documents[idx], 'score': float(score)}
+                for score, idx in zip(scores[0], indices[0])
+                if idx >= 0
+            ]
+
+        # Rows are unit length, so cosine similarity is one mat-vec product
+        if self.quantize:
+            similarities = np.concatenate([
+                self._unit[i:i + _SCAN_BLOCK_ROWS].astype(np.float32) @ query
+                for i in range(0, len(self._unit), _SCAN_BLOCK_ROWS)
+            ]) / _INT8_SCALE
+        else:
+            similarities = self._unit @ query
 
         top_k = min(top_k, len(similarities))
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
+        top_indices = np.argpartition(similarities, -top_k)[-top_k:]
+        top_indices = top_indices[np.argsort(similarities[top_indices])[::-1]]
 
         results = []
         for idx in top_indices:
@@ -41,9 +145,10 @@ class VectorStore:
         return results
 
     def save(self, filepath: str):
+        embeddings = self.embeddings
         data = {
             'documents': self.documents,
-            'embeddings': self.embeddings.tolist() if self.embeddings is not None else None
+            'embeddings': embeddings.tolist() if embeddings is not None else None
         }
         with open(filepath, 'wb') as f:
             pickle.dump(data, f)
@@ -53,7 +158,7 @@ class VectorStore:
             data = pickle.load(f)
 
         self.documents = data['documents']
-        self.embeddings = np.array(data['embeddings']) if data['embeddings'] else None
+        self.embeddings = data['embeddings'] if data['embeddings'] else None
 
     def clear(self):
         self.documents = []
@@ -0,0 +1,68 @@
+"""Shared test fakes."""
+
+from types import SimpleNamespace
+
+import pytest
+from embeddings import BaseEmbeddings
+
+
+class RecordingEmbeddings(BaseEmbeddings):
+    """Offline provider that records what it is asked to embed.
+
+    ``queries`` holds the texts passed to `embed`, ``calls`` one
+    ``(texts, batch_size)`` pair per `embed_batch` call and ``texts`` every
+    text embedded in a batch.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.calls = []
+        self.texts = []
+
+    def embed(self, text):
+        self.queries.append(text)
+        return self._vector(text)
+
+    def embed_batch(self, texts, batch_size=100):
+        self.calls.append((list(texts), batch_size))
+        self.texts.extend(texts)
+        return [self._vector(t) for t in texts]
+
+    @staticmethod
+    def _vector(text):
+        return [float(len(text)), 1.0]
+
+    @property
+    def dimension(self):
+        return 2
+
+    @property
+    def model_name(self):
+        return "recording"
+
+
+@pytest.fixture
+def recording_embeddings():
+    """A fresh `RecordingEmbeddings` per test."""
+    return RecordingEmbeddings()
+
+
+@pytest.fixture
+def fake_openai_client():
+    """Factory for a stand-in OpenAI client.
+
+    ``make(fn, calls)`` returns a client whose ``embeddings.create`` passes the
+    input texts (always a list) to ``fn`` and wraps the vectors it returns in
+    the API's response shape. Each call's texts are appended to ``calls``
+    before ``fn`` runs, when given.
+    """
+    def make(fn, calls=None):
+        def create(input, model=None):
+            texts = input if isinstance(input, list) else [input]
+            if calls is not None:
+                calls.append(list(texts))
+            return SimpleNamespace(data=[SimpleNamespace(embedding=v) for v in fn(texts)])
+
+        return SimpleNamespace(embeddings=SimpleNamespace(create=create))
+
+    return make
@@ -91,3 +91,390 @@ def test_voyage_dimension_property():
         assert voyage_lite.dimension == 512
     except ImportError:
         pytest.skip("voyageai not installed")
+
+
+def test_openai_embed_batch_concurrent_preserves_order(monkeypatch):
+    """Test that concurrent OpenAI batches are reassembled in input order."""
+    import asyncio
+    import openai
+
+    class FakeAsyncClient:
+        def __init__(self, api_key=None):
+            self.embeddings = self
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            return False
+
+        async def create(self, input, model=None):
+            # Finish later batches first to exercise reordering
+            await asyncio.sleep(0.01 / (1 + int(input[0])))
+
+            class Item:
+                def __init__(self, embedding):
+                    self.embedding = embedding
+
+            class Resp:
+                data = [Item([float(text)]) for text in input]
+
+            return Resp()
+
+    monkeypatch.setattr(openai, "AsyncOpenAI", FakeAsyncClient)
+
+    embeddings = OpenAIEmbeddings(api_key="fake")
+    texts = [str(i) for i in range(10)]
+    result = embeddings.embed_batch(texts, batch_size=3)
+
+    assert result == [[float(i)] for i in range(10)]
+
+
+def test_openai_embed_retries_transient_errors(monkeypatch, fake_openai_client):
+    """Test that transient API errors are retried instead of aborting."""
+    import httpx
+    import openai
+    from tenacity import wait_none
+
+    monkeypatch.setattr(OpenAIEmbeddings._create_with_retry.retry, "wait", wait_none())
+
+    calls = []
+
+    def flaky(texts):
+        if len(calls) < 3:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com"))
+        return [[0.5, 0.5]]
+
+    embeddings = OpenAIEmbeddings(api_key="fake")
+    embeddings.client = fake_openai_client(flaky, calls)
+
+    assert embeddings.embed("hello") == [0.5, 0.5]
+    assert len(calls) == 3
+
+
+def test_embedding_cache_only_embeds_misses(tmp_path):
+    """Test that cached embeddings skip the API and misses are stored."""
+    from embeddings import EmbeddingCache
+
+    cache = EmbeddingCache(str(tmp_path / "embeddings.db"))
+    sent = []
+
+    def fake_embed(texts):
+        sent.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    first = cache.embed_through("model-a", ["a", "bb"], fake_embed).tolist()
+    second = cache.embed_through("model-a", ["bb", "ccc", "a"], fake_embed).tolist()
+    other_model = cache.embed_through("model-b", ["a"], fake_embed).tolist()
+
+    assert first == [[1.0, 1.0], [2.0, 1.0]]
+    assert second == [[2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+    assert other_model == [[1.0, 1.0]]
+    assert sent == [["a", "bb"], ["ccc"], ["a"]]
+    assert len(cache) == 4
+
+
+def test_openai_embed_repeated_text_uses_memory_cache(fake_openai_client):
+    """Test that repeated single-text embeds are served from memory."""
+    calls = []
+
+    embeddings = OpenAIEmbeddings(api_key="fake")
+    embeddings.client = fake_openai_client(lambda texts: [[0.1, 0.2]], calls)
+
+    assert embeddings.embed("query") == [0.1, 0.2]
+    assert embeddings.embed("query") == [0.1, 0.2]
+    assert len(calls) == 1
+
+    embeddings.clear_cache()
+    embeddings.embed("query")
+    assert len(calls) == 2
+
+
+def test_micro_batcher_coalesces_concurrent_calls():
+    """Test that concurrent single-text encodes are fused into fewer batches."""
+    import threading
+    import time
+    from embeddings.sentence_transformer_embeddings import _MicroBatcher
+
+    batches = []
+
+    def encode_batch(texts):
+        batches.append(list(texts))
+        time.sleep(0.05)
+        return [[float(len(t))] for t in texts]
+
+    batcher = _MicroBatcher(encode_batch, max_batch_size=64)
+    results = {}
+
+    def worker(text):
+        results[text] = batcher.submit(text)
+
+    threads = [threading.Thread(target=worker, args=("x" * i,)) for i in range(1, 21)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {"x" * i: [float(i)] for i in range(1, 21)}
+    assert sum(len(b) for b in batches) == 20
+    assert len(batches) < 20
+
+
+def test_onnx_backend_falls_back_to_torch_without_optimum(monkeypatch):
+    """Test that a missing ONNX toolchain downgrades the backend with a warning."""
+    import sys
+    from embeddings.sentence_transformer_embeddings import _resolve_backend
+
+    # None in sys.modules makes the import raise ImportError
+    monkeypatch.setitem(sys.modules, "optimum", None)
+    monkeypatch.setitem(sys.modules, "optimum.onnxruntime", None)
+
+    with pytest.warns(UserWarning, match="falling back to the torch backend"):
+        assert _resolve_backend("onnx") == "torch"
+    assert _resolve_backend("openvino") == "openvino"
+
+
+def test_sentence_transformer_small_batches_skip_worker_pool():
+    """Test that batches below SHARD_MIN_TEXTS are encoded without starting workers."""
+    import numpy as np
+    from embeddings.sentence_transformer_embeddings import SHARD_MIN_TEXTS
+
+    class FakeModel:
+        def encode(self, texts, **kwargs):
+            return np.array([[float(len(t))] for t in texts])
+
+    # Skip __init__, which needs sentence-transformers and a downloaded model
+    emb = SentenceTransformerEmbeddings.__new__(SentenceTransformerEmbeddings)
+    emb.model = FakeModel()
+    emb.num_workers = 4
+    emb._pool = None
+    emb._pool_finalizer = None
+
+    texts = ["x" * (i % 7) for i in range(SHARD_MIN_TEXTS - 1)]
+    assert emb._encode_uncached(texts, batch_size=32).shape == (len(texts), 1)
+    assert emb._pool is None
+
+    with emb:
+        pass
+    assert emb._pool is None
+
+
+def test_openai_embed_batch_np_returns_float32_array(fake_openai_client):
+    """Test that batch embeddings are written into a float32 array."""
+    import numpy as np
+
+    embeddings = OpenAIEmbeddings(api_key="fake")
+    embeddings.client = fake_openai_client(lambda texts: [[float(len(t)), 0.5] for t in texts])
+
+    result = embeddings.embed_batch_np(["a", "bb", "ccc"])
+
+    assert isinstance(result, np.ndarray)
+    assert result.dtype == np.float32
+    assert result.tolist() == [[1.0, 0.5], [2.0, 0.5], [3.0, 0.5]]
+    assert embeddings.embed_batch(["a"]) == [[1.0, 0.5]]
+
+
+def test_openai_embed_batch_np_quantize_int8(fake_openai_client):
+    """Test that quantized batches are normalized int8 and keep cosine order."""
+    import numpy as np
+
+    embeddings = OpenAIEmbeddings(api_key="fake", quantize=True)
+    embeddings.client = fake_openai_client(lambda texts: [[3.0, 4.0], [0.0, -2.0]])
+
+    result = embeddings.embed_batch_np(["a", "b"])
+
+    assert result.dtype == np.int8
+    assert result.tolist() == [[76, 102], [0, -127]]
+    # The list API still returns the raw float vectors
+    assert embeddings.embed_batch(["a", "b"]) == [[3.0, 4.0], [0.0, -2.0]]
+
+
+def fake_openai_batch_client(respond):
+    """Fake Batch API client: ``respond(custom_id, text)`` returns an embedding, or
+    None to report that request in the error file. ``client.uploaded`` holds the
+    submitted request lines."""
+    import json
+    from types import SimpleNamespace
+
+    uploaded = []
+    files = {}
+
+    def create_file(file, purpose):
+        assert purpose == "batch"
+        uploaded.extend(json.loads(line) for line in file[1].decode("utf-8").splitlines())
+        output, errors = [], []
+        # Output order is not guaranteed to match input order
+        for req in reversed(uploaded):
+            embedding = respond(req["custom_id"], req["body"]["input"])
+            if embedding is None:
+                errors.append({
+                    "custom_id": req["custom_id"],
+                    "response": {"status_code": 400, "body": {"error": {"message": "input is invalid"}}},
+                    "error": None,
+                })
+            else:
+                output.append({
+                    "custom_id": req["custom_id"],
+                    "response": {"status_code": 200, "body": {"data": [{"embedding": embedding}]}},
+                    "error": None,
+                })
+        files["file-out"] = "\n".join(json.dumps(line) for line in output)
+        files["file-err"] = "\n".join(json.dumps(line) for line in errors)
+        return SimpleNamespace(id="file-in")
+
+    def create_batch(input_file_id, endpoint, completion_window):
+        assert endpoint == "/v1/embeddings"
+        return SimpleNamespace(id="batch-1", status="validating", output_file_id=None, error_file_id=None)
+
+    def retrieve(batch_id):
+        return SimpleNamespace(
+            id=batch_id, status="completed",
+            output_file_id="file-out" if files["file-out"] else None,
+            error_file_id="file-err" if files["file-err"] else None,
+        )
+
+    return SimpleNamespace(
+        files=SimpleNamespace(create=create_file, content=lambda file_id: SimpleNamespace(text=files[file_id])),
+        batches=SimpleNamespace(create=create_batch, retrieve=retrieve),
+        uploaded=uploaded,
+    )
+
+
+def test_openai_embed_batch_async_job_reassembles_by_custom_id():
+    """Test that Batch API output lines are mapped back to input order."""
+    embeddings = OpenAIEmbeddings(api_key="fake")
+    embeddings.client = fake_openai_batch_client(lambda custom_id, text: [float(len(text))])
+
+    result = embeddings.embed_batch_async_job(["a", "bbb", "cc", "a"], poll_interval=0)
+
+    assert result.tolist() == [[1.0], [3.0], [2.0], [1.0]]
+    # The duplicate is uploaded (and billed) once
+    assert [req["body"]["input"] for req in embeddings.client.uploaded] == ["a", "bbb", "cc"]
+
+
+def test_openai_embed_batch_async_job_reports_failed_requests():
+    """Test that blank texts fail before upload and failed lines are reported."""
+    embeddings = OpenAIEmbeddings(api_key="fake")
+    embeddings.client = fake_openai_batch_client(lambda custom_id, text: None if text == "bad" else [1.0])
+
+    with pytest.raises(ValueError, match="blank text"):
+        embeddings.embed_batch_async_job(["a", " "], poll_interval=0)
+    assert embeddings.client.uploaded == []
+
+    with pytest.raises(RuntimeError, match="returned 1 of 2 embeddings: request 1: input is invalid"):
+        embeddings.embed_batch_async_job(["a", "bad"], poll_interval=0)
+
+
+def test_embeddings_package_imports_providers_lazily():
+    """Test that importing the package does not import provider SDKs."""
+    import subprocess
+    import sys
+
+    code = "import sys, embeddings; print('openai' in sys.modules, 'voyageai' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert out.stdout.strip() == "False False"
+
+
+def test_openai_embed_batch_dedupes_and_rejects_blank_texts(fake_openai_client):
+    """Test that duplicates are embedded once and blanks are rejected, not zero-filled."""
+    sent = []
+
+    embeddings = OpenAIEmbeddings(api_key="fake")
+    embeddings.client = fake_openai_client(lambda texts: [[float(len(t))] for t in texts], sent)
+
+    result = embeddings.embed_batch(["aa", "b", "aa"])
+
+    assert sent == [["aa", "b"]]
+    assert result == [[2.0], [1.0], [2.0]]
+
+    with pytest.raises(ValueError, match="blank text"):
+        embeddings.embed_batch(["aa", "  "])
+    assert len(sent) == 1
+
+
+def test_voyage_embed_batch_concurrent_preserves_order(monkeypatch):
+    """Test that concurrent Voyage batches are reassembled in input order."""
+    import asyncio
+    from types import SimpleNamespace
+
+    voyageai = pytest.importorskip("voyageai")
+
+    class FakeAsyncClient:
+        def __init__(self, api_key=None):
+            pass
+
+        async def embed(self, texts, model=None):
+            # Every request runs with the call's shared, still open session
+            sessions.add(voyageai.aiosession.get())
+            assert not voyageai.aiosession.get().closed
+            await asyncio.sleep(0.01 / (1 + int(texts[0])))
+            return SimpleNamespace(embeddings=[[float(t)] for t in texts])
+
+    monkeypatch.setattr(voyageai, "AsyncClient", FakeAsyncClient)
+
+    embeddings = VoyageEmbeddings(api_key="fake")
+    texts = [str(i) for i in range(10)]
+    sessions = set()
+
+    assert embeddings.embed_batch(texts, batch_size=3) == [[float(i)] for i in range(10)]
+
+    # The session is closed when the call returns, and not left installed
+    (session,) = sessions
+    assert session.closed
+    assert voyageai.aiosession.get() is None
+
+
+def test_fit_batch_size_respects_token_limit():
+    """Test that long texts shrink the batch size to fit the token limit."""
+    from embeddings.base_embeddings import fit_batch_size
+
+    assert fit_batch_size(["x" * 40] * 10, 100, token_limit=300_000) == 100
+    assert fit_batch_size(["x" * 40_000] * 10, 100, token_limit=300_000) == 30
+    assert fit_batch_size(["x" * 10_000_000], 100, token_limit=300_000) == 1
+    assert fit_batch_size([], 100, token_limit=300_000) == 100
+
+
+def test_voyage_embed_retries_rate_limit_with_retry_after():
+    """Test that Voyage 429s are retried, honouring Retry-After."""
+    from types import SimpleNamespace
+
+    pytest.importorskip("voyageai")
+    from voyageai import error
+
+    calls = []
+
+    class FakeClient:
+        def embed(self, texts, model=None):
+            calls.append(list(texts))
+            if len(calls) < 3:
+                raise error.RateLimitError("slow down", headers={"retry-after": "0"})
+            return SimpleNamespace(embeddings=[[1.0, 2.0] for _ in texts])
+
+    embeddings = VoyageEmbeddings(api_key="fake")
+    embeddings.client = FakeClient()
+
+    assert embeddings.embed_batch(["a"]) == [[1.0, 2.0]]
+    assert len(calls) == 3
+
+
+def test_near_duplicate_filter_embeds_duplicates_once():
+    """Test that near-duplicate texts reuse one embedding call."""
+    from embeddings import NearDuplicateFilter
+
+    footer = "Home About Products Contact Us. Copyright Example Corp. All rights reserved. " * 3
+    article = "Python is a programming language created by Guido van Rossum in 1991."
+    sent = []
+
+    def fake_embed(texts):
+        sent.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+    dedupe = NearDuplicateFilter()
+    first = dedupe.embed_through([footer, article, footer.upper()], fake_embed)
+    second = dedupe.embed_through(["  " + footer], fake_embed)
+
+    assert sent == [[footer, article]]
+    assert first.tolist() == [[len(footer), 1.0], [len(article), 1.0], [len(footer), 1.0]]
+    assert second.tolist() == [[len(footer), 1.0]]
+    assert len(dedupe) == 2
@@ -153,3 +153,87 @@ def test_graph_rag_with_custom_embeddings():
 
     except ImportError:
         pytest.skip("sentence-transformers not installed")
+
+
+def test_graph_rag_add_documents_bulk(tmp_path, recording_embeddings):
+    """Test bulk ingestion embeds all chunks in one length-sorted call."""
+    emb = recording_embeddings
+    graph_rag = GraphRAGSystem(
+        api_key="fake_key",
+        embeddings=emb,
+        enable_graph_extraction=False,
+        persist_directory=str(tmp_path / "db"),
+        collection_name="test_bulk"
+    )
+
+    docs = [
+        {"content": "Long document. " * 20, "source": "a.txt", "type": "text"},
+        {"content": "A shorter document that is still over fifty characters.", "source": "b.txt", "type": "text"},
+    ]
+    added = graph_rag.add_documents_bulk(docs, batch_size=1024)
+
+    assert added == 2
+    assert len(emb.calls) == 1
+    texts, batch_size = emb.calls[0]
+    assert batch_size == 1024
+    assert [len(t) for t in texts] == sorted(len(t) for t in texts)
+    assert graph_rag.vector_store.collection.count() == 2
+
+
+def test_graph_rag_load_directory_embeds_once(tmp_path, recording_embeddings):
+    """Test loading a directory embeds and stores all files in one batch."""
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.txt").write_text("First file sentence. " * 10)
+    (data / "b.txt").write_text("Second file sentence. " * 10)
+
+    emb = recording_embeddings
+    graph_rag = GraphRAGSystem(
+        api_key="fake_key",
+        embeddings=emb,
+        enable_graph_extraction=False,
+        persist_directory=str(tmp_path / "db"),
+        collection_name="test_dir"
+    )
+
+    updates = []
+    summary = graph_rag.load_file(str(data), verbose=True, progress=lambda *u: updates.append(u))
+
+    assert updates == [(0, 2), (1, 2), (2, 2)]
+    assert summary['added_chunks'] == 2
+    assert len(summary['processed_files']) == 2
+    assert len(emb.calls) == 1
+    assert graph_rag.vector_store.collection.count() == 2
+
+
+def test_graph_rag_load_directory_splits_large_batches(tmp_path, monkeypatch, recording_embeddings):
+    """Test a directory with more chunks than Chroma's batch limit is stored in slices."""
+    data = tmp_path / "data"
+    data.mkdir()
+    for i in range(5):
+        (data / f"{i}.txt").write_text(f"File number {i} sentence. " * 10)
+
+    graph_rag = GraphRAGSystem(
+        api_key="fake_key",
+        embeddings=recording_embeddings,
+        enable_graph_extraction=False,
+        persist_directory=str(tmp_path / "db"),
+        collection_name="test_large_dir"
+    )
+
+    # Shrink the limit instead of loading thousands of chunks
+    storage = graph_rag.vector_store
+    monkeypatch.setattr(storage.client, "get_max_batch_size", lambda: 2)
+    collection_cls = type(storage.collection)
+    original_add = collection_cls.add
+    sizes = []
+
+    def recording_add(self, ids, **kwargs):
+        sizes.append(len(ids))
+        return original_add(self, ids=ids, **kwargs)
+
+    monkeypatch.setattr(collection_cls, "add", recording_add)
+
+    assert graph_rag.load_file(str(data)) == 5
+    assert sizes == [2, 2, 1]
+    assert storage.collection.count() == 5
@@ -41,6 +41,20 @@ def test_vector_store_add_and_search(vector_store: VectorStore):
     assert results[0]["source"] == "a"
 
 
+def test_vector_store_incremental_adds(vector_store: VectorStore):
+    vector_store.add_documents([{"content": "x", "source": "x", "type": "text"}], [[1.0, 0.0]])
+    results = vector_store.search([1.0, 0.0], top_k=1)
+    assert results[0]["source"] == "x"
+
+    # Adding after a search invalidates the index; both adds stack in order
+    vector_store.add_documents([{"content": "y", "source": "y", "type": "text"}], [[0.0, 2.0]])
+    assert vector_store.embeddings.shape == (2, 2)
+    assert vector_store.embeddings.dtype == "float32"
+    results = vector_store.search([0.0, 1.0], top_k=2)
+    assert [r["source"] for r in results] == ["y", "x"]
+    assert results[0]["score"] == pytest.approx(1.0)
+
+
 def test_rag_instantiation_and_mock_embeddings(monkeypatch):
     # Import here to avoid side-effects at module import time
     from ragsystem import RAGSystem
@@ -87,3 +101,217 @@ def test_rag_instantiation_and_mock_embeddings(monkeypatch):
     assert isinstance(results, list)
     if results:
         assert "score" in results[0]
+
+
+def test_chunker_memoizes_repeated_text(chunker: TextChunker):
+    text = "This is a sentence. " * 20
+    first = chunker.chunk(text)
+    first.append("mutated")
+    assert chunker.chunk(text) == first[:-1]
+    assert chunker._chunk_cached.cache_info().hits == 1
+
+
+def test_chunker_text_splitter_backend():
+    pytest.importorskip("semantic_text_splitter")
+    chunker = TextChunker(chunk_size=200, chunk_overlap=50, use_text_splitter=True)
+    chunks = chunker.chunk("This is a sentence. " * 40)
+    assert len(chunks) > 1
+    assert all(50 < len(c) <= 200 for c in chunks)
+
+
+def test_chunker_token_windows(monkeypatch):
+    import sys
+    import types
+
+    # Whitespace "tokenizer" standing in for tiktoken so the test runs offline
+    class FakeEncoding:
+        def encode(self, text):
+            return text.split()
+
+        def decode_batch(self, batches):
+            return [" ".join(ids) for ids in batches]
+
+    fake_tiktoken = types.SimpleNamespace(get_encoding=lambda name: FakeEncoding())
+    monkeypatch.setitem(sys.modules, "tiktoken", fake_tiktoken)
+
+    chunker = TextChunker(chunk_size=20, chunk_overlap=5, tokenizer="cl100k_base")
+    words = [f"word{i}" for i in range(50)]
+    chunks = chunker.chunk(" ".join(words))
+
+    assert [c.split() for c in chunks] == [words[0:20], words[15:35], words[30:50]]
+
+
+def test_load_directory_reports_processed_files(tmp_path):
+    from ragsystem import RAGSystem
+
+    data = tmp_path / "data"
+    (data / "sub").mkdir(parents=True)
+    (data / "a.txt").write_text("Plain text file with enough words to make one chunk. " * 3)
+    (data / "sub" / "b.md").write_text("# Title\n\nMarkdown file with enough words to make a chunk. " * 3)
+    (data / "c.xyz").write_text("unsupported")
+
+    rs = RAGSystem(api_key="fake", persist_directory=str(tmp_path / "db"))
+    updates = []
+    summary = rs.load_file(str(data), verbose=True, progress=lambda *u: updates.append(u))
+
+    assert updates == [(0, 3), (1, 3), (2, 3), (3, 3)]
+    processed = dict(summary["processed_files"])
+    assert set(processed) == {str(data / "a.txt"), str(data / "sub" / "b.md")}
+    assert processed[str(data / "a.txt")] == (data / "a.txt").stat().st_size
+    assert summary["skipped_files"] == [str(data / "c.xyz")]
+
+
+def test_chroma_stores_share_client_per_directory(tmp_path):
+    from ragsystem.storage import ChromaVectorStore, get_client
+
+    first = ChromaVectorStore(str(tmp_path), "first_docs")
+    second = ChromaVectorStore(str(tmp_path), "second_docs")
+    assert first.client is second.client is get_client(str(tmp_path))
+    assert {"first_docs", "second_docs"} <= set(first.get_collections())
+
+
+def test_chroma_in_memory_search_matches_chroma(tmp_path):
+    from ragsystem.storage import ChromaVectorStore
+
+    store = ChromaVectorStore(str(tmp_path), "mirrored_docs")
+    docs = [{"content": str(i), "source": str(i), "type": "text"} for i in range(3)]
+    store.add_documents(docs, [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    in_memory = store.search([0.0, 3.0], top_k=2, in_memory=True)
+    assert [r["source"] for r in in_memory] == [r["source"] for r in store.search([0.0, 3.0], top_k=2)]
+    assert in_memory[0]["score"] == pytest.approx(1.0)
+
+    # Later adds reach the mirror without rebuilding it
+    mirror = store._mirror
+    store.add_documents([{"content": "3", "source": "3", "type": "text"}], [[0.0, 5.0]])
+    results = store.search([0.0, 1.0], top_k=4, in_memory=True)
+    assert store._mirror is mirror
+    assert len(results) == 4 and {r["source"] for r in results[:2]} == {"1", "3"}
+
+
+def test_chroma_in_memory_search_quantized(tmp_path):
+    from ragsystem.storage import ChromaVectorStore
+
+    store = ChromaVectorStore(str(tmp_path), "quantized_docs", quantize_mirror=True)
+    docs = [{"content": str(i), "source": str(i), "type": "text"} for i in range(3)]
+    store.add_documents(docs, [[3.0, 4.0], [0.0, 2.0], [-1.0, 0.0]])
+
+    results = store.search([0.0, 1.0], top_k=3, in_memory=True)
+    assert store._mirror._unit.dtype == "int8"
+    assert [r["source"] for r in results] == ["1", "0", "2"]
+    assert [r["score"] for r in results] == pytest.approx([1.0, 0.8, 0.0], abs=0.01)
+
+
+def test_load_websites_embeds_all_pages_once(tmp_path, recording_embeddings):
+    from ragsystem import RAGSystem
+
+    class FakeWebLoader:
+        def load(self, url):
+            if url.endswith("/bad"):
+                raise ValueError(f"Error loading website {url}")
+            return [{"content": f"Page at {url} with enough text to form a chunk. " * 3,
+                     "source": url, "type": "website"}]
+
+    rs = RAGSystem(api_key="fake", persist_directory=str(tmp_path), embeddings=recording_embeddings)
+    rs.web_loader = FakeWebLoader()
+    urls = ["https://example.com/a", "https://example.com/bad", "https://example.com/b"]
+    summary = rs.load_websites(urls, max_workers=2)
+
+    assert summary["loaded_urls"] == ["https://example.com/a", "https://example.com/b"]
+    assert [e["url"] for e in summary["errors"]] == ["https://example.com/bad"]
+    assert summary["added_chunks"] == 2
+    assert len(recording_embeddings.calls) == 1
+    assert len(rs.vector_store) == 2
+
+    # Embedding page by page while the rest are fetched gives the same result
+    summary = rs.load_websites(urls, max_workers=2, pages_per_batch=1)
+
+    assert summary["loaded_urls"] == ["https://example.com/a", "https://example.com/b"]
+    assert summary["added_chunks"] == 2
+    assert len(recording_embeddings.calls) == 3
+    assert len(rs.vector_store) == 4
+
+
+def test_vector_store_ann_search():
+    # Uses FAISS HNSW when installed, the exact scan otherwise
+    store = VectorStore(ann=True)
+    docs = [{"content": str(i), "source": str(i), "type": "text"} for i in range(3)]
+    store.add_documents(docs, [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    results = store.search([0.0, 3.0], top_k=2)
+    assert [r["source"] for r in results] == ["1", "2"]
+    assert results[0]["score"] == pytest.approx(1.0)
+
+
+def test_vector_store_quantized():
+    store = VectorStore(quantize=True)
+    docs = [{"content": str(i), "source": str(i), "type": "text"} for i in range(3)]
+    store.add_documents(docs, [[3.0, 4.0], [0.0, 2.0], [-1.0, 0.0]])
+
+    assert store.embeddings.ravel() == pytest.approx([3.0, 4.0, 0.0, 2.0, -1.0, 0.0], abs=0.05)
+    assert store._unit.dtype == "int8"
+
+    results = store.search([0.0, 1.0], top_k=3)
+    assert [r["source"] for r in results] == ["1", "0", "2"]
+    assert [r["score"] for r in results] == pytest.approx([1.0, 0.8, 0.0], abs=0.01)
+
+
+def test_repeated_query_embeds_once(monkeypatch, tmp_path, fake_openai_client):
+    from ragsystem import RAGSystem
+    from embeddings.openai_embeddings import OpenAIEmbeddings
+
+    calls = []
+    client = fake_openai_client(lambda texts: [[0.1] * 8 for _ in texts], calls)
+    monkeypatch.setattr(OpenAIEmbeddings, "_ensure_client", lambda self: setattr(self, "client", client))
+
+    rs = RAGSystem(api_key="fake", persist_directory=str(tmp_path))
+    rs.search("What is this website about?")
+    rs.search("What is this website about?")
+    assert len(calls) == 1
+
+    rs.clear_query_cache()
+    rs.search("What is this website about?")
+    assert len(calls) == 2
+
+
+def test_query_with_sources_and_stream(tmp_path, recording_embeddings):
+    from types import SimpleNamespace
+    from ragsystem import RAGSystem
+
+    class FakeChat:
+        class completions:
+            @staticmethod
+            def create(**kwargs):
+                if kwargs.get("stream"):
+                    return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+                                 for piece in ("ans", None, "wer")])
+                return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="answer"))])
+
+    rs = RAGSystem(api_key="fake", persist_directory=str(tmp_path), embeddings=recording_embeddings)
+    rs.client = SimpleNamespace(chat=FakeChat)
+    rs._process_documents([{"content": "Some document text long enough to be a chunk. " * 3,
+                            "source": "doc.txt", "type": "text"}])
+
+    answer, sources = rs.query_with_sources("question?", top_k=3)
+
+    assert answer == "answer"
+    assert [s["source"] for s in sources] == ["doc.txt"]
+    assert len(recording_embeddings.queries) == 1
+
+    sources, pieces = rs.query_stream("question?", top_k=3)
+
+    assert [s["source"] for s in sources] == ["doc.txt"]
+    assert list(pieces) == ["ans", "wer"]
+
+
+def test_process_documents_drops_blank_chunks(tmp_path, recording_embeddings):
+    from ragsystem import RAGSystem
+
+    rs = RAGSystem(api_key="fake", persist_directory=str(tmp_path), embeddings=recording_embeddings)
+    rs.chunker.chunk = lambda text: [text, "  \n "]
+
+    added = rs._process_documents([{"content": "Some real text.", "source": "a", "type": "text"}])
+
+    assert added == 1
+    assert recording_embeddings.texts == ["Some real text."]
+    assert len(rs.vector_store) == 1